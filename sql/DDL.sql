@@ -44,7 +44,9 @@ ENGINE = MergeTree()
 ORDER BY (pickup_date, pickup_hour, PULocationID, DOLocationID)
 -- Partition by month for better query performance and data management  
 PARTITION BY toYYYYMM(tpep_pickup_datetime)
-SETTINGS index_granularity = 8192;
+-- Deduplication window for the insert_deduplication_token of retried or re-sent inserts; existing tables:
+-- ALTER TABLE yellow_taxi_trips MODIFY SETTING non_replicated_deduplication_window = 1000
+SETTINGS index_granularity = 8192, non_replicated_deduplication_window = 1000;
 
 -- ==============================================
 -- GREEN TAXI TABLE (Optimized Schema)
@@ -89,7 +91,8 @@ ENGINE = MergeTree()
 ORDER BY (pickup_date, pickup_hour, PULocationID, DOLocationID)
 -- Partition by month for better query performance and data management
 PARTITION BY toYYYYMM(lpep_pickup_datetime)
-SETTINGS index_granularity = 8192;
+-- Deduplication window for the insert_deduplication_token of retried or re-sent inserts
+SETTINGS index_granularity = 8192, non_replicated_deduplication_window = 1000;
 
 -- ==============================================
 -- UNIFIED VIEW FOR CROSS-TAXI ANALYSIS
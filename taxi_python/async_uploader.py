@@ -0,0 +1,525 @@
+"""
+asyncio uploader that overlaps parquet decoding with many concurrent inserts.
+
+`AsyncTaxiDataUploader` reads and transforms files with a `YellowTaxiUploader` or
+`GreenTaxiUploader` inside a thread or process executor, while the event loop keeps up to
+`max_concurrent_inserts` inserts in flight on clickhouse-connect's async client, across
+several files at once. `upload_file`, `upload_all_files` and `display_summary` mirror the
+synchronous uploader as coroutines and return the same results.
+
+The async client requires aiohttp: pip install 'clickhouse-connect[async]'
+
+Example:
+    async with AsyncTaxiDataUploader(YellowTaxiUploader, connection_string, engine='arrow') as uploader:
+        await uploader.upload_all_files(data_path, 'yellow_tripdata_*.parquet')
+"""
+import asyncio
+import collections
+import contextlib
+import io
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from clickhouse_connect import get_async_client
+
+import sinks
+import upload_metrics
+from uploader import InsertRetryPlan, _batch_nbytes
+
+# Where files are read and transformed: threads share the process, processes side-step the GIL
+EXECUTORS = ('thread', 'process')
+
+# Uploader options of the synchronous insert path and the only value accepted for them
+UNSUPPORTED_OPTIONS = {
+    'pipeline_depth': 0,
+    'transform_workers': 1,
+    'insert_workers': 1,
+    'max_inflight_blocks': None,
+    'replace': False,
+    'dry_run': False,
+    'partition_block_rows': None,
+    'partition_block_mb': None
+}
+
+# Local sinks that can stand in for the async client
+LOCAL_SCHEMES = ('null', 'memory')
+
+# Transform-only uploader owned by a process-pool worker (see `_init_transform_worker`)
+_worker_uploader = None
+
+
+def _init_transform_worker(uploader_cls, connection_string: str, uploader_kwargs: dict, schemas: dict, layouts: dict) -> None:
+    """Create one transform-only uploader per worker process, answering schema lookups locally."""
+    global _worker_uploader
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_uploader = uploader_cls(connection_string, client=sinks.NullSink(schemas, layouts), **uploader_kwargs)
+
+
+def _prepare_row_group_in_worker(file_path: str, skip_row_groups: set, skip_batches: set) -> tuple:
+    """Read and prepare the one row group not in `skip_row_groups` inside a worker process."""
+    _worker_uploader.timer.reset()
+    _worker_uploader.memory.reset()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        blocks = list(prepare_blocks(_worker_uploader, file_path, skip_row_groups=skip_row_groups,
+                                     skip_batches=skip_batches))
+    return blocks, _worker_uploader.timer.stats(), _worker_uploader.memory.stats()
+
+
+def prepare_blocks(uploader, file_path: str, stats: dict = None, skip_row_groups: set = frozenset(),
+                   skip_batches: set = frozenset()):
+    """
+    Read and transform a file with a synchronous uploader, sorting each block if enabled and
+    converting it to what the insert format sends (pandas for native, Arrow otherwise).
+
+    Yields:
+        (unit, rows_read, block) tuples, `unit` as in `TaxiDataUploader._iter_row_group_batches`.
+    """
+    batches = uploader._iter_row_group_batches(file_path, stats, skip_row_groups, skip_batches)
+    if uploader.engine == 'arrow':
+        transform = uploader.transform_table
+    else:
+        batches = uploader._to_pandas_batches(batches)
+        transform = uploader.transform_batch
+
+    for unit, batch in batches:
+        with uploader.timer.measure('transform') as record:
+            block = transform(batch)
+            if uploader.sort_blocks and len(block) > 0:
+                block = uploader.sort_block(block)
+            if uploader.insert_format == 'native' and isinstance(block, pa.Table):
+                block = block.to_pandas()
+            elif uploader.insert_format != 'native' and not isinstance(block, pa.Table):
+                block = pa.Table.from_pandas(block, preserve_index=False)
+            record['bytes'] = _batch_nbytes(block)
+        uploader.memory.check()
+        yield unit, len(batch), block
+
+
+def _parquet_bytes(block: pa.Table, compression: str) -> bytes:
+    sink = pa.BufferOutputStream()
+    pq.write_table(block, sink, compression=compression)
+    return sink.getvalue().to_pybytes()
+
+
+class AsyncTaxiDataUploader:
+    """
+    Uploads taxi files with clickhouse-connect's async client.
+
+    Every file in progress checks out its own transform-only `uploader_cls` instance, so stage
+    timings and memory stats stay per file. Inserts from all files share one semaphore of
+    `max_concurrent_inserts` slots, and a file only reads its next block once one is free.
+    With the process executor, whole row groups are decoded ahead; all files share
+    `decode_workers` slots for row groups decoded but not yet handed to inserts. Memory is
+    bounded by both: blocks being inserted plus row groups decoded ahead.
+    """
+    def __init__(self, uploader_cls, connection_string: str, max_concurrent_inserts: int = 8,
+                 max_concurrent_files: int = 2, executor: str = 'thread', decode_workers: int = None,
+                 client=None, **uploader_options):
+        """
+        Args:
+            uploader_cls: `YellowTaxiUploader` or `GreenTaxiUploader`, defining the table and transformation.
+            connection_string: ClickHouse HTTP connection string, or `null://` / `memory://`.
+            max_concurrent_inserts: Max inserts in flight across all files.
+            max_concurrent_files: Files read, transformed and inserted at the same time.
+            executor: 'thread' or 'process' executor for reading and transforming files.
+            decode_workers: Executor size, and with the process executor the number of row groups
+                decoded ahead across all files. Defaults to `max_concurrent_files`.
+            client: Optional async client to use instead of connecting with `connection_string`.
+            uploader_options: Options of `uploader_cls`, e.g. engine, batch_size, insert_format,
+                insert_retries, async_insert or manifest_path. Options of the synchronous insert
+                path (`UNSUPPORTED_OPTIONS`) are rejected.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {EXECUTORS}")
+        for option, accepted in UNSUPPORTED_OPTIONS.items():
+            if uploader_options.get(option, accepted) != accepted:
+                raise ValueError(f"'{option}' is not supported by AsyncTaxiDataUploader, use {uploader_cls.__name__} instead")
+        if client is None and sinks.is_local(connection_string) and urlparse(connection_string).scheme not in LOCAL_SCHEMES:
+            raise ValueError(f"AsyncTaxiDataUploader only writes to ClickHouse or {', '.join(f'{s}://' for s in LOCAL_SCHEMES)}")
+
+        self.uploader_cls = uploader_cls
+        self.connection_string = connection_string
+        self.max_concurrent_inserts = max(1, max_concurrent_inserts)
+        self.max_concurrent_files = max(1, max_concurrent_files)
+        self.executor = executor
+        self.decode_workers = max(1, decode_workers or self.max_concurrent_files)
+        self.uploader_options = uploader_options
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Holds the configuration, manifest and metrics settings; never sends anything
+            self.uploader = uploader_cls(connection_string, client=sinks.NullSink(), **uploader_options)
+        self.table_name = self.uploader.table_name
+        self.client = client
+        # Created by `connect` inside the running event loop
+        self._transform_uploaders = None
+        self._insert_slots = None
+        self._decode_slots = None
+        self._executor = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _create_client(self):
+        if sinks.is_local(self.connection_string):
+            return sinks.AsyncSink(sinks.create_local_sink(self.connection_string))
+        scheme = urlparse(self.connection_string).scheme
+        if scheme not in sinks.HTTP_SCHEMES:
+            raise ValueError(f"AsyncTaxiDataUploader needs a ClickHouse HTTP connection string, got '{scheme}://'")
+        try:
+            return await get_async_client(**sinks.http_client_kwargs(self.connection_string, self.uploader.insert_compression))
+        except ImportError as e:
+            raise ImportError("AsyncTaxiDataUploader requires aiohttp: pip install 'clickhouse-connect[async]'") from e
+
+    async def connect(self) -> None:
+        """Connect, fetch the target table's layout and start the executor; done on first use."""
+        if self._transform_uploaders is not None:
+            return
+        if self.client is None:
+            self.client = await self._create_client()
+
+        # Transform uploaders answer DESCRIBE TABLE and sorting key lookups from the server's answers
+        describe = await self.client.query(f"DESCRIBE TABLE {self.table_name}")
+        sorting = await self.client.query(
+            "SELECT sorting_key FROM system.tables "
+            f"WHERE database = currentDatabase() AND name = '{self.table_name}'"
+        )
+        sorting_key = sorting.result_rows[0][0] if sorting.result_rows else ''
+        schemas = {self.table_name: [(row[0], row[1]) for row in describe.result_rows]}
+        layouts = {self.table_name: {'order_by': [col.strip() for col in sorting_key.split(',') if col.strip()],
+                                     'partition_column': None}}
+
+        options = {**self.uploader_options, 'manifest_path': None, 'metrics_textfile': None}
+        self._transform_uploaders = asyncio.Queue()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(self.max_concurrent_files):
+                self._transform_uploaders.put_nowait(
+                    self.uploader_cls(self.connection_string, client=sinks.NullSink(schemas, layouts), **options)
+                )
+        self._insert_slots = asyncio.Semaphore(self.max_concurrent_inserts)
+        self._decode_slots = asyncio.Semaphore(self.decode_workers)
+        if self.executor == 'process':
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.decode_workers,
+                initializer=_init_transform_worker,
+                initargs=(self.uploader_cls, self.connection_string, options, schemas, layouts)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix='decode')
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self.client is not None:
+            await self.client.close()
+
+    def _record_metric(self, kind: str, name: str, labels: dict, value: float = 1) -> None:
+        if self.uploader.collect_metrics:
+            getattr(upload_metrics.REGISTRY, kind)(name, labels, value)
+
+    async def _prepared_blocks(self, uploader, file_path: str, stats: dict, skip_row_groups: set, skip_batches: set):
+        """Async iterator over `prepare_blocks` of a file, run in the executor."""
+        loop = asyncio.get_running_loop()
+        if self.executor == 'thread':
+            blocks = prepare_blocks(uploader, file_path, stats, skip_row_groups, skip_batches)
+            while (item := await loop.run_in_executor(self._executor, next, blocks, None)) is not None:
+                yield item
+            return
+
+        # Process executor: one task per row group, each holding a decode slot until its blocks are handed out
+        parquet_file = pq.ParquetFile(file_path)
+        num_row_groups = parquet_file.num_row_groups
+        pruned_row_groups = uploader._prunable_row_groups(parquet_file)
+        stats['row_groups_total'] = num_row_groups
+        stats['row_groups_pruned'] = len(pruned_row_groups)
+        stats['row_groups_resumed'] = len(set(skip_row_groups) - pruned_row_groups)
+        print(f"  Total rows in file: {parquet_file.metadata.num_rows:,}, across {num_row_groups} row groups.")
+        row_groups = collections.deque(i for i in range(num_row_groups) if i not in pruned_row_groups and i not in skip_row_groups)
+        stats['batches_resumed'] = len({(row_group, batch_index) for row_group, batch_index in skip_batches
+                                        if row_group not in skip_row_groups and row_group not in pruned_row_groups})
+        pending = collections.deque()
+        try:
+            while row_groups or pending:
+                # Only wait for a slot with nothing decoding for this file; otherwise another
+                # file could hold every slot while this one holds decoded blocks
+                while row_groups and (not pending or not self._decode_slots.locked()):
+                    await self._decode_slots.acquire()
+                    row_group = row_groups.popleft()
+                    others = set(range(num_row_groups)) - {row_group}
+                    pending.append(loop.run_in_executor(self._executor, _prepare_row_group_in_worker, file_path, others,
+                                                        {unit for unit in skip_batches if unit[0] == row_group}))
+                future = pending.popleft()
+                try:
+                    blocks, stage_stats, memory_stats = await future
+                    for stage, totals in stage_stats.items():
+                        uploader.timer.add(stage, totals['wall_seconds'], totals['cpu_seconds'], totals['bytes'])
+                    stats['worker_peak_rss_mb'] = max(stats.get('worker_peak_rss_mb', 0), memory_stats['peak_rss_mb'])
+                    for item in blocks:
+                        yield item
+                    del blocks
+                finally:
+                    self._decode_slots.release()
+        finally:
+            for future in pending:
+                future.cancel()
+                self._decode_slots.release()
+
+    async def _insert_block(self, block, settings: dict) -> None:
+        insert_format = self.uploader.insert_format
+        if insert_format == 'native':
+            await self.client.insert_df(table=self.table_name, df=block, settings=settings)
+        elif insert_format == 'arrow':
+            await self.client.insert_arrow(table=self.table_name, arrow_table=block, settings=settings)
+        else:
+            # Encoding parquet is CPU-bound, keep it off the event loop
+            data = await asyncio.to_thread(_parquet_bytes, block, self.uploader.insert_compression or 'lz4')
+            await self.client.raw_insert(self.table_name, column_names=block.column_names, insert_block=data,
+                                         settings=settings, fmt='Parquet')
+
+    async def _insert_with_retry(self, block, token: str, query_id_prefix: str = None) -> dict:
+        """Insert a block following an `InsertRetryPlan`, as `TaxiDataUploader._insert_with_retry` does."""
+        plan = InsertRetryPlan(self.uploader, block, token, query_id_prefix)
+        while (attempt := plan.next_attempt()) is not None:
+            part, settings = attempt
+            try:
+                await self._insert_block(part, settings)
+                plan.succeeded()
+            except Exception as e:
+                await asyncio.sleep(plan.failed(e))
+        return plan.stats
+
+    async def _count_rows(self) -> int:
+        return (await self.client.query(f"SELECT count() FROM {self.table_name}")).result_rows[0][0]
+
+    async def _wait_until_visible(self, query_id_prefix: str) -> float:
+        """Poll until the server has flushed this file's async inserts, as `TaxiDataUploader._wait_until_visible` does."""
+        start = time.perf_counter()
+        query = self.uploader._pending_inserts_query(self.table_name, query_id_prefix)
+        for interval in self.uploader._visibility_polls(self.table_name):
+            if (await self.client.query(query)).result_rows[0][0] == 0:
+                return time.perf_counter() - start
+            await asyncio.sleep(interval)
+
+    async def upload_file(self, file_path: str) -> dict:
+        """Upload a single parquet file, with its inserts running concurrently."""
+        await self.connect()
+        uploader = await self._transform_uploaders.get()
+        try:
+            return await self._upload_file(uploader, file_path)
+        finally:
+            self._transform_uploaders.put_nowait(uploader)
+
+    async def _upload_file(self, uploader, file_path: str) -> dict:
+        file_name = Path(file_path).name
+        print(f"\n🚀 Processing: {file_name}")
+
+        start_time = time.time()
+        totals = {'processed': 0, 'uploaded': 0, 'batches': 0, 'insert_call_seconds': 0.0, 'retries': 0, 'splits': 0}
+        labels = {'taxi_type': self.uploader.taxi_type or self.table_name, 'file': file_name}
+        manifest = self.uploader.manifest
+        uploader.timer.reset()
+        uploader.memory.reset()
+        tasks = set()
+        errors = []
+
+        try:
+            file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+            print(f"  📁 File size: {file_size_mb:.1f} MB")
+
+            completed_row_groups = set()
+            completed_batches = set()
+            batch_size = uploader._resolve_batch_size(pq.ParquetFile(file_path))
+            if manifest:
+                if manifest.is_file_complete(self.table_name, file_path):
+                    print("  ⏭️  Already loaded according to the manifest, skipping.")
+                    return self.uploader._skipped_result(file_name, file_size_mb, start_time)
+                completed_row_groups = manifest.completed_row_groups(self.table_name, file_path)
+                completed_batches = manifest.completed_batches(self.table_name, file_path, batch_size)
+
+            # Query ids of this file's inserts, to wait for exactly them to become visible
+            query_id_prefix = f"{self.table_name}-{uuid.uuid4().hex}" if self.uploader.async_insert else None
+
+            token_prefix = self.uploader._token_prefix(file_path, batch_size, resume=manifest is not None)
+            # Unacknowledged async inserts may still fail, then only the whole file is marked
+            mark_batches = manifest is not None and not (self.uploader.async_insert and not self.uploader.async_insert_wait)
+
+            def batch_done(unit: tuple) -> None:
+                if mark_batches:
+                    row_group, batch_index, is_last = unit
+                    manifest.mark_batch(self.table_name, file_path, row_group, batch_index, batch_size, is_last)
+
+            async def send(unit: tuple, block, token: str) -> None:
+                try:
+                    insert_start = time.perf_counter()
+                    insert_stats = await self._insert_with_retry(block, token, query_id_prefix)
+                    insert_seconds = time.perf_counter() - insert_start
+                    uploader.timer.add('insert', insert_seconds, 0.0, _batch_nbytes(block))
+                    totals['insert_call_seconds'] += insert_seconds
+                    totals['retries'] += insert_stats['retries']
+                    totals['splits'] += insert_stats['splits']
+                    totals['uploaded'] += len(block)
+                    totals['batches'] += 1
+                    self._record_metric('observe', 'taxi_uploader_insert_latency_seconds', labels, insert_seconds)
+                    self._record_metric('inc', 'taxi_uploader_rows_inserted_total', labels, len(block))
+                    self._record_metric('inc', 'taxi_uploader_bytes_inserted_total', labels, _batch_nbytes(block))
+                    if insert_stats['retries']:
+                        self._record_metric('inc', 'taxi_uploader_insert_retries_total', labels, insert_stats['retries'])
+                    if insert_stats['splits']:
+                        self._record_metric('inc', 'taxi_uploader_block_splits_total', labels, insert_stats['splits'])
+                    batch_done(unit)
+                except Exception as e:
+                    errors.append(e)
+
+            read_stats = {}
+            blocks = self._prepared_blocks(uploader, file_path, read_stats, completed_row_groups, completed_batches)
+            # Closed on errors too, so row groups decoded ahead give back their decode slots
+            async with contextlib.aclosing(blocks):
+                async for unit, rows_read, block in blocks:
+                    if errors:
+                        raise errors[0]
+                    totals['processed'] += rows_read
+                    self._record_metric('inc', 'taxi_uploader_rows_read_total', labels, rows_read)
+                    self._record_metric('inc', 'taxi_uploader_rows_filtered_total', labels, rows_read - len(block))
+                    if len(block) > 0:
+                        await self._insert_slots.acquire()
+                        task = asyncio.create_task(send(unit, block, uploader._block_token(token_prefix, [unit])))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        # Also runs for tasks cancelled before they started, which never reach a finally
+                        task.add_done_callback(lambda _: self._insert_slots.release())
+                    else:
+                        batch_done(unit)
+                    del block
+
+            await asyncio.gather(*tasks)
+            if errors:
+                raise errors[0]
+            read_stats['acknowledged_seconds'] = time.time() - start_time
+
+            if query_id_prefix is not None:
+                with uploader.timer.measure('verify'):
+                    lag = await self._wait_until_visible(query_id_prefix)
+                read_stats['visibility_lag_seconds'] = lag
+                print(f"  ⏱️  Rows visible {lag:.2f}s after the last insert was acknowledged")
+            read_stats['visible_seconds'] = time.time() - start_time
+
+            if manifest:
+                manifest.mark_file(self.table_name, file_path)
+
+            self._record_metric('inc', 'taxi_uploader_bytes_read_total', labels, uploader.timer.stats().get('read', {}).get('bytes', 0))
+
+            elapsed_time = time.time() - start_time
+            print(f"  ✅ {totals['uploaded']:,} rows in {totals['batches']} insert(s), {elapsed_time:.1f}s")
+            return {
+                'file': file_name,
+                'file_size_mb': file_size_mb,
+                'rows_processed': totals['processed'],
+                'rows_uploaded': totals['uploaded'],
+                'rows_filtered': totals['processed'] - totals['uploaded'],
+                'batches_processed': totals['batches'],
+                'engine': self.uploader.engine,
+                'dry_run': False,
+                'executor': self.executor,
+                'max_concurrent_inserts': self.max_concurrent_inserts,
+                'sort_blocks': self.uploader.sort_blocks,
+                # Summed over concurrent inserts, so it can exceed the file's wall time
+                'insert_call_seconds': totals['insert_call_seconds'],
+                'insert_format': self.uploader.insert_format,
+                'insert_compression': self.uploader.insert_compression,
+                'async_insert': self.uploader.async_insert,
+                'insert_retries': totals['retries'],
+                'block_splits': totals['splits'],
+                'time_seconds': elapsed_time,
+                'rows_per_second': totals['uploaded'] / elapsed_time if elapsed_time > 0 else 0,
+                'mb_per_second': file_size_mb / elapsed_time if elapsed_time > 0 else 0,
+                **read_stats,
+                **uploader.memory.stats(),
+                'stages': uploader.timer.stats()
+            }
+        except Exception as e:
+            print(f"❌ Error processing {file_name}: {str(e)}")
+            self._record_metric('inc', 'taxi_uploader_errors_total', labels)
+            traceback.print_exc()
+            return {
+                'file': file_name,
+                'error': str(e),
+                'rows_uploaded': totals['uploaded'],
+                'time_seconds': time.time() - start_time
+            }
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.uploader.metrics_textfile:
+                upload_metrics.REGISTRY.write_textfile(self.uploader.metrics_textfile)
+
+    async def upload_all_files(self, data_path: str, file_pattern: str, specific_files: list = None) -> dict:
+        """
+        Upload all files matching a pattern, `max_concurrent_files` at a time.
+
+        Returns:
+            The table name, per-file results and totals for run reports, or None if nothing ran.
+        """
+        parquet_files = self.uploader._select_files(data_path, file_pattern, specific_files)
+        if not parquet_files:
+            return
+        total_size_mb = sum(os.path.getsize(file) for file in parquet_files) / (1024 * 1024)
+
+        try:
+            await self.connect()
+            await self.client.query(f"SELECT 1 FROM {self.table_name} LIMIT 1")
+            print("✅ ClickHouse connection verified, table exists.")
+        except ImportError:
+            raise
+        except Exception as e:
+            print(f"❌ Table verification failed for '{self.table_name}': {str(e)}")
+            print("💡 Make sure you've run the CREATE TABLE script first!")
+            return
+
+        print(f"⚙️  Uploading up to {self.max_concurrent_files} files with {self.max_concurrent_inserts} "
+              f"concurrent inserts ({self.executor} executor).")
+        total_start_time = time.time()
+        results = list(await asyncio.gather(*(self.upload_file(file_path) for file_path in parquet_files)))
+        total_elapsed = time.time() - total_start_time
+
+        await self.display_summary(results, total_size_mb, total_elapsed)
+        return {
+            'table': self.table_name,
+            'results': results,
+            'total_size_mb': total_size_mb,
+            'total_elapsed': total_elapsed
+        }
+
+    async def display_summary(self, results: list, total_size_mb: float, total_elapsed: float) -> None:
+        """Displays a summary of the upload process."""
+        self.uploader._display_totals(results, total_size_mb, total_elapsed)
+        if isinstance(self.client, sinks.AsyncSink):
+            print(f"  🔍 Written to {type(self.client.sink).__name__}, nothing to verify in ClickHouse")
+            return
+
+        try:
+            row_count = await self._count_rows()
+            print(f"  🔍 Verified in ClickHouse: {row_count:,} rows in {self.table_name}")
+            stats = (await self.client.query(
+                f"SELECT MIN(pickup_date), MAX(pickup_date), COUNT(DISTINCT pickup_date) FROM {self.table_name}"
+            )).result_rows[0]
+            print(f"  📅 Date range: {stats[0]} to {stats[1]} ({stats[2]} unique days)")
+        except Exception as e:
+            print(f"  ❌ Could not verify data in ClickHouse: {str(e)}")
+
+
+async def upload_all(uploader_cls, connection_string: str, data_path: str, file_pattern: str,
+                     specific_files: list = None, **options) -> dict:
+    """Upload all matching files with a fresh `AsyncTaxiDataUploader` and close it afterwards."""
+    async with AsyncTaxiDataUploader(uploader_cls, connection_string, **options) as uploader:
+        return await uploader.upload_all_files(data_path, file_pattern, specific_files)
@@ -0,0 +1,210 @@
+"""
+Offline ingest benchmark for the taxi data uploaders.
+
+Runs the read, transform and full upload paths of `YellowTaxiUploader` / `GreenTaxiUploader`
+against synthetic TLC files and a `null://` or `memory://` sink instead of ClickHouse, so throughput can be
+measured on any machine without downloads or a running server.
+
+Example:
+    python benchmark.py --rows 2000000 --engines pandas,arrow --pipeline-depths 0,2 --repeat 3
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import generate_tlc_data
+from uploader import GreenTaxiUploader, YellowTaxiUploader
+
+UPLOADERS = {'yellow': YellowTaxiUploader, 'green': GreenTaxiUploader}
+
+# 'read' decodes parquet batches, 'transform' adds the transformation, 'upload' runs upload_file
+STAGES = ('read', 'transform', 'upload')
+
+
+def _run_stage(uploader, stage: str, file_path: str) -> tuple:
+    """Run one stage over a file and return (rows_read, rows_out, upload result or {})."""
+    if stage == 'upload':
+        result = uploader.upload_file(file_path)
+        if 'error' in result:
+            raise RuntimeError(f"Upload of {file_path} failed: {result['error']}")
+        return result['rows_processed'], result['rows_uploaded'], result
+
+    uploader.memory.reset()
+    batches = uploader._iter_row_group_batches(file_path)
+    if stage == 'transform' and uploader.engine == 'pandas':
+        batches = uploader._to_pandas_batches(batches)
+
+    rows_read = rows_out = 0
+    for _, batch in batches:
+        rows_read += len(batch)
+        if stage == 'read':
+            rows_out += len(batch)
+        elif uploader.engine == 'arrow':
+            rows_out += uploader.transform_table(batch).num_rows
+        else:
+            rows_out += len(uploader.transform_batch(batch))
+        uploader.memory.check()
+    return rows_read, rows_out, {}
+
+
+def run_scenario(taxi_type: str, files: list, stage: str, engine: str, pipeline_depth: int,
+                 batch_size: int, sink: str = 'null://', repeat: int = 1, **uploader_options) -> dict:
+    """
+    Benchmark one configuration, repeating it `repeat` times.
+
+    `sink` is any uploader connection string; against a real ClickHouse server the upload
+    stage inserts into the actual tables. Other keyword arguments go to the uploader.
+
+    Returns:
+        The configuration with the median and best wall time and rows/sec over all repeats,
+        plus the median time spent sorting blocks, inside insert calls and waiting for async
+        inserts to become visible for uploads.
+    """
+    uploader_cls = UPLOADERS[taxi_type]
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploader = uploader_cls(sink, batch_size=batch_size, engine=engine, pipeline_depth=pipeline_depth,
+                                **uploader_options)
+
+    size_mb = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+    timings = []
+    upload_timings = {'sort_seconds': [], 'insert_call_seconds': [], 'wire_bytes': [], 'visibility_lag_seconds': []}
+    peak_rss_mb = 0.0
+    rows_read = rows_out = 0
+    for _ in range(repeat):
+        if hasattr(uploader.client, 'blocks'):
+            uploader.client.blocks.clear()
+        start = time.perf_counter()
+        repeat_timings = dict.fromkeys(upload_timings, 0)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            rows_read = rows_out = 0
+            for path in files:
+                read, out, result = _run_stage(uploader, stage, path)
+                rows_read += read
+                rows_out += out
+                for key in repeat_timings:
+                    repeat_timings[key] += result.get(key) or 0
+                peak_rss_mb = max(peak_rss_mb, uploader.memory.stats()['peak_rss_mb'])
+        timings.append(time.perf_counter() - start)
+        for key, value in repeat_timings.items():
+            upload_timings[key].append(value)
+
+    median = statistics.median(timings)
+    return {
+        'taxi_type': taxi_type,
+        'stage': stage,
+        'engine': engine,
+        'pipeline_depth': pipeline_depth,
+        'batch_size': batch_size,
+        'sink': sink.split('@')[-1],
+        **uploader_options,
+        'files': len(files),
+        'size_mb': size_mb,
+        'rows_read': rows_read,
+        'rows_out': rows_out,
+        'repeat': repeat,
+        'median_seconds': median,
+        'best_seconds': min(timings),
+        'rows_per_second': rows_read / median if median > 0 else 0,
+        'best_rows_per_second': rows_read / min(timings) if min(timings) > 0 else 0,
+        'mb_per_second': size_mb / median if median > 0 else 0,
+        'peak_rss_mb': peak_rss_mb,
+        'sort_seconds': statistics.median(upload_timings['sort_seconds']),
+        'insert_call_seconds': statistics.median(upload_timings['insert_call_seconds']),
+        'wire_bytes': statistics.median(upload_timings['wire_bytes']),
+        'visibility_lag_seconds': statistics.median(upload_timings['visibility_lag_seconds']),
+        'insert_format': uploader.insert_format,
+        'insert_compression': uploader.insert_compression or 'default'
+    }
+
+
+def _csv(value: str, cast=str) -> list:
+    return [cast(item.strip()) for item in value.split(',') if item.strip()]
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the taxi uploaders against synthetic data and an in-memory or real sink.")
+    parser.add_argument('--data', type=str, help='Directory with existing *_tripdata_*.parquet files. Generated into a temporary directory if omitted.')
+    parser.add_argument('--taxi_type', choices=['yellow', 'green'], default='yellow', help='Taxi feed to benchmark.')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows per generated file. Defaults to 1,000,000.')
+    parser.add_argument('--months', type=int, default=1, help='Number of monthly files to generate. Defaults to 1.')
+    parser.add_argument('--row-group-size', type=int, default=1_000_000, help='Row group size of generated files.')
+    parser.add_argument('--casing', choices=sorted(generate_tlc_data.CASING_VARIANTS), default='standard', help='Column casing of generated files.')
+    parser.add_argument('--stages', type=str, default=','.join(STAGES), help=f"Comma-separated stages to run ({', '.join(STAGES)}).")
+    parser.add_argument('--engines', type=str, default='pandas,arrow', help='Comma-separated engines to compare.')
+    parser.add_argument('--pipeline-depths', type=str, default='0', help='Comma-separated pipeline depths to compare.')
+    parser.add_argument('--batch-sizes', type=str, default='50000', help='Comma-separated batch sizes to compare.')
+    parser.add_argument('--sink', type=str, default='null', help="'null' drops inserted blocks, 'memory' keeps them; any other uploader connection string, "
+                                                                   "e.g. a ClickHouse server, measures real insert times. Defaults to null.")
+    parser.add_argument('--insert-formats', type=str, default='auto', help="Comma-separated insert wire formats to compare for uploads (auto, native, arrow, parquet).")
+    parser.add_argument('--insert-compressions', type=str, default='default', help="Comma-separated insert compressions to compare for uploads (default, lz4, zstd, gzip, none).")
+    parser.add_argument('--insert-workers', type=str, default='1', help="Comma-separated numbers of concurrent insert workers to compare for uploads.")
+    parser.add_argument('--insert-modes', type=str, default='sync', help="Comma-separated insert modes to compare for uploads (sync, async, async-nowait).")
+    parser.add_argument('--sort-modes', type=str, default='off', help="Comma-separated block sorting modes to compare for uploads (off, on).")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration; the median is reported. Defaults to 3.')
+    parser.add_argument('--json', type=str, help='Write the results to this JSON file.')
+    args = parser.parse_args(argv)
+
+    sink = args.sink if '://' in args.sink else f'{args.sink}://'
+    with tempfile.TemporaryDirectory(prefix='taxi_benchmark_') as tmp_dir:
+        data_dir = args.data or tmp_dir
+        if not args.data:
+            print(f"🧪 Generating {args.months} synthetic {args.taxi_type} file(s) with {args.rows:,} rows each...")
+            for i, month in enumerate(generate_tlc_data.month_range('2023-01', args.months)):
+                generate_tlc_data.write_month(data_dir, args.taxi_type, month, args.rows, args.row_group_size,
+                                              casing=args.casing, seed=i)
+        files = sorted(
+            os.path.join(data_dir, name) for name in os.listdir(data_dir)
+            if name.startswith(f'{args.taxi_type}_tripdata_') and name.endswith('.parquet')
+        )
+        if not files:
+            print(f"❌ No {args.taxi_type} files found in {data_dir}")
+            return
+
+        results = []
+        # Settings that only affect upload_file; other stages run with the first value only
+        upload_settings = {
+            'pipeline_depth': _csv(args.pipeline_depths, int),
+            'sort_mode': _csv(args.sort_modes),
+            'insert_format': _csv(args.insert_formats),
+            'insert_compression': _csv(args.insert_compressions),
+            'insert_workers': _csv(args.insert_workers, int),
+            'insert_mode': _csv(args.insert_modes)
+        }
+        print(f"\n{'Stage':<10} {'Engine':<7} {'Depth':>5} {'Batch':>8} {'Sort':>4} {'Format':>7} {'Comp':>7} {'Ins W':>5} {'Mode':>12} {'Rows':>11} "
+              f"{'Median s':>9} {'Rows/sec':>12} {'MB/s':>7} {'Sort s':>7} {'Insert s':>9} {'Wire MB':>8} {'Lag s':>6} {'Peak RSS':>9}")
+        print("-" * 165)
+        for stage, engine, batch_size, *settings in itertools.product(
+                _csv(args.stages), _csv(args.engines), _csv(args.batch_sizes, int), *upload_settings.values()):
+            depth, sort_mode, insert_format, insert_compression, insert_workers, insert_mode = settings
+            if stage != 'upload' and settings != [values[0] for values in upload_settings.values()]:
+                continue
+            result = run_scenario(
+                args.taxi_type, files, stage, engine, depth, batch_size, sink, args.repeat,
+                sort_blocks=(stage == 'upload' and sort_mode == 'on'),
+                insert_format=insert_format,
+                insert_compression=None if insert_compression == 'default' else insert_compression,
+                insert_workers=insert_workers,
+                async_insert=insert_mode.startswith('async'),
+                async_insert_wait=insert_mode != 'async-nowait'
+            )
+            results.append(result)
+            print(f"{stage:<10} {engine:<7} {depth:>5} {batch_size:>8,} {'on' if result['sort_blocks'] else 'off':>4} "
+                  f"{result['insert_format']:>7} {result['insert_compression']:>7} {insert_workers:>5} {insert_mode:>12} "
+                  f"{result['rows_read']:>11,} {result['median_seconds']:>9.2f} {result['rows_per_second']:>12,.0f} "
+                  f"{result['mb_per_second']:>7.1f} {result['sort_seconds']:>7.2f} {result['insert_call_seconds']:>9.2f} "
+                  f"{result['wire_bytes'] / (1024 * 1024):>8.1f} {result['visibility_lag_seconds']:>6.2f} {result['peak_rss_mb']:>8.0f}M")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📝 Wrote benchmark results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
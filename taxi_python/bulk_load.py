@@ -0,0 +1,160 @@
+"""
+Bulk-load partition files written by `uploader.py --export` into ClickHouse.
+
+Every exported file holds one toYYYYMM partition of a table, sorted by the table's ORDER BY
+key, so ClickHouse can write it as a few large, already sorted parts. Two load methods:
+
+    stream  Streams each file over HTTP as the body of an `INSERT ... FORMAT Parquet|Arrow`,
+            the HTTP equivalent of clickhouse-client's `INSERT ... FROM INFILE`.
+    file    Runs `INSERT ... SELECT ... FROM file()` on the server. The export directory has
+            to be inside the server's user_files_path, given with --user-files-dir.
+
+Example:
+    python bulk_load.py ../data/export --table yellow_taxi_trips --replace
+"""
+import argparse
+import glob
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from clickhouse_connect import get_client
+
+import sinks
+
+# File extension -> ClickHouse input format
+INPUT_FORMATS = {extension: fmt for extension, _, fmt in sinks.FILE_FORMATS.values()}
+
+METHODS = ('stream', 'file')
+
+
+def find_exported_files(export_dir: str, table: str) -> dict:
+    """Map partition -> sorted list of exported files of one table."""
+    partitions = {}
+    for path in sorted(glob.glob(os.path.join(export_dir, table, '*', 'part-*.*'))):
+        if os.path.splitext(path)[1].lstrip('.') in INPUT_FORMATS:
+            partitions.setdefault(os.path.basename(os.path.dirname(path)), []).append(path)
+    return partitions
+
+
+def _file_schema(path: str) -> pa.Schema:
+    if path.endswith('.parquet'):
+        return pq.read_schema(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def _file_rows(path: str) -> int:
+    if path.endswith('.parquet'):
+        return pq.read_metadata(path).num_rows
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def load_file(client, table: str, path: str, method: str = 'stream', user_files_dir: str = None,
+              settings: dict = None) -> None:
+    """Insert one exported file into `table`, matching columns by name."""
+    fmt = INPUT_FORMATS[os.path.splitext(path)[1].lstrip('.')]
+    column_names = _file_schema(path).names
+    if method == 'stream':
+        with open(path, 'rb') as f:
+            client.raw_insert(table, column_names=column_names, insert_block=f, settings=settings, fmt=fmt)
+        return
+
+    relative_path = os.path.relpath(os.path.abspath(path), os.path.abspath(user_files_dir)) if user_files_dir else path
+    columns = ', '.join(f'`{name}`' for name in column_names)
+    client.command(
+        f"INSERT INTO {table} ({columns}) SELECT {columns} FROM file('{relative_path}', {fmt})",
+        settings=settings
+    )
+
+
+def load_table(client, export_dir: str, table: str, method: str = 'stream', user_files_dir: str = None,
+               replace: bool = False, block_rows: int = None, partitions: list = None) -> list:
+    """
+    Load every exported partition of one table.
+
+    Args:
+        replace: Load each partition into a staging table and swap it in with REPLACE PARTITION,
+            so reloading a month does not duplicate its rows. The partition ends up with exactly
+            the exported rows, so stray rows exported from a neighbouring month's file would
+            replace that whole month; restrict such loads with `partitions`.
+        block_rows: Optional insert block size. A value at least the size of the files keeps
+            each file in a single part instead of ClickHouse's default ~1M-row blocks.
+        partitions: Optional YYYYMM partitions to load; all exported partitions by default.
+
+    Returns:
+        One dict per partition with its files, rows and load time.
+    """
+    settings = None
+    if block_rows:
+        settings = {'max_insert_block_size': block_rows, 'min_insert_block_size_rows': block_rows}
+
+    results = []
+    for partition, paths in sorted(find_exported_files(export_dir, table).items()):
+        if partitions and partition not in partitions:
+            continue
+        start_time = time.time()
+        rows = sum(_file_rows(path) for path in paths)
+        target_table = table
+        if replace:
+            target_table = f"{table}_staging_{partition}"
+            client.command(f"DROP TABLE IF EXISTS {target_table}")
+            client.command(f"CREATE TABLE {target_table} AS {table}")
+        try:
+            for path in paths:
+                load_file(client, target_table, path, method, user_files_dir, settings)
+            if replace:
+                staged_rows = client.query(f"SELECT count() FROM {target_table}").result_rows[0][0]
+                if staged_rows != rows:
+                    raise RuntimeError(f"Staging table {target_table} has {staged_rows:,} rows, expected {rows:,}")
+                client.command(f"ALTER TABLE {table} REPLACE PARTITION {partition} FROM {target_table}")
+        finally:
+            if replace:
+                client.command(f"DROP TABLE IF EXISTS {target_table}")
+
+        elapsed = time.time() - start_time
+        results.append({'partition': partition, 'files': len(paths), 'rows': rows, 'time_seconds': elapsed})
+        print(f"  ✅ {table} {partition}: {rows:,} rows from {len(paths)} file(s) in {elapsed:.1f}s "
+              f"({rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
+    return results
+
+
+def connect(connection_string: str):
+    """Connect over HTTP like the uploader does, honouring the connection string's `compress` option."""
+    options = {key: values[-1] for key, values in parse_qs(urlparse(connection_string).query).items()}
+    return get_client(**sinks.http_client_kwargs(connection_string, options.get('compress')))
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load files exported by uploader.py --export into ClickHouse.")
+    parser.add_argument('export_dir', help='Directory passed to uploader.py --export.')
+    parser.add_argument('--table', action='append', help='Table to load; repeat for several. Defaults to every table in the export directory.')
+    parser.add_argument('--method', choices=METHODS, default='stream', help="'stream' sends the files over HTTP, 'file' reads them on the server. Defaults to stream.")
+    parser.add_argument('--user-files-dir', type=str, help="Server's user_files_path as seen from this machine, required for --method file.")
+    parser.add_argument('--replace', action='store_true', help='Replace each loaded partition instead of appending to it.')
+    parser.add_argument('--partition', action='append', help='YYYYMM partition to load; repeat for several. Defaults to all.')
+    parser.add_argument('--block-rows', type=int, help='Insert block size in rows, so each file is written as a single part.')
+    args = parser.parse_args(argv)
+
+    if args.method == 'file' and not args.user_files_dir:
+        parser.error('--method file requires --user-files-dir')
+
+    connection_string = os.getenv("CLICKHOUSE_CONNECTION_STRING", "clickhouse://default:@localhost:8123/default")
+    client = connect(connection_string)
+    tables = args.table or sorted(
+        name for name in os.listdir(args.export_dir) if os.path.isdir(os.path.join(args.export_dir, name))
+    )
+    for table in tables:
+        print(f"🚀 Loading {table} from {args.export_dir}")
+        results = load_table(client, args.export_dir, table, args.method, args.user_files_dir, args.replace, args.block_rows, args.partition)
+        rows = sum(r['rows'] for r in results)
+        elapsed = sum(r['time_seconds'] for r in results)
+        print(f"🎉 {table}: {rows:,} rows in {len(results)} partition(s), {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
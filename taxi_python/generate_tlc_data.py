@@ -0,0 +1,222 @@
+"""
+Generate synthetic NYC TLC trip parquet files for offline benchmarking.
+
+Files follow the real yellow/green TLC schemas and naming (e.g. yellow_tripdata_2023-01.parquet)
+including the quirks the uploaders have to deal with: column casing variants such as
+`airport_fee`/`Airport_fee` and `Ratecodeid`, nulls, stray rows from other months and rows
+that fail the data quality filters.
+
+Example:
+    python generate_tlc_data.py --output ../data/synthetic --months 2023-01,2023-02 --rows 3000000
+"""
+import argparse
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Columns in file order, as published by the TLC (types of recent files)
+YELLOW_SCHEMA = [
+    ('VendorID', pa.int32()),
+    ('tpep_pickup_datetime', pa.timestamp('us')),
+    ('tpep_dropoff_datetime', pa.timestamp('us')),
+    ('passenger_count', pa.int64()),
+    ('trip_distance', pa.float64()),
+    ('RatecodeID', pa.int64()),
+    ('store_and_fwd_flag', pa.string()),
+    ('PULocationID', pa.int32()),
+    ('DOLocationID', pa.int32()),
+    ('payment_type', pa.int64()),
+    ('fare_amount', pa.float64()),
+    ('extra', pa.float64()),
+    ('mta_tax', pa.float64()),
+    ('tip_amount', pa.float64()),
+    ('tolls_amount', pa.float64()),
+    ('improvement_surcharge', pa.float64()),
+    ('total_amount', pa.float64()),
+    ('congestion_surcharge', pa.float64()),
+    ('Airport_fee', pa.float64()),
+    ('cbd_congestion_fee', pa.float64())
+]
+
+GREEN_SCHEMA = [
+    ('VendorID', pa.int32()),
+    ('lpep_pickup_datetime', pa.timestamp('us')),
+    ('lpep_dropoff_datetime', pa.timestamp('us')),
+    ('store_and_fwd_flag', pa.string()),
+    ('RatecodeID', pa.float64()),
+    ('PULocationID', pa.int32()),
+    ('DOLocationID', pa.int32()),
+    ('passenger_count', pa.float64()),
+    ('trip_distance', pa.float64()),
+    ('fare_amount', pa.float64()),
+    ('extra', pa.float64()),
+    ('mta_tax', pa.float64()),
+    ('tip_amount', pa.float64()),
+    ('tolls_amount', pa.float64()),
+    ('ehail_fee', pa.float64()),
+    ('improvement_surcharge', pa.float64()),
+    ('total_amount', pa.float64()),
+    ('payment_type', pa.float64()),
+    ('trip_type', pa.float64()),
+    ('congestion_surcharge', pa.float64()),
+    ('cbd_congestion_fee', pa.float64())
+]
+
+# Column name variants seen across TLC releases, selected with --casing
+CASING_VARIANTS = {
+    'standard': {},
+    'lower': {'Airport_fee': 'airport_fee'},
+    'mixed': {'Airport_fee': 'airport_fee', 'RatecodeID': 'Ratecodeid'}
+}
+
+
+def _month_bounds(month: str) -> tuple:
+    start = np.datetime64(f"{month}-01", 'us')
+    end = (np.datetime64(f"{month}", 'M') + 1).astype('datetime64[us]')
+    return start, end
+
+
+def generate_trips(taxi_type: str, month: str, rows: int, dirty_fraction: float = 0.02,
+                   stray_fraction: float = 0.001, casing: str = 'standard', seed: int = 0) -> pa.Table:
+    """
+    Generate one month of synthetic trips for `taxi_type` ('yellow' or 'green').
+
+    Args:
+        month: Month in YYYY-MM form; pickups fall inside it apart from stray rows.
+        rows: Number of rows to generate.
+        dirty_fraction: Share of rows with nulls or values that fail the quality filters.
+        stray_fraction: Share of rows whose pickup lies in another month or year.
+        casing: Column casing variant, one of CASING_VARIANTS.
+        seed: Random seed, so the same arguments always produce the same file.
+    """
+    rng = np.random.default_rng(seed)
+    prefix = 'tpep' if taxi_type == 'yellow' else 'lpep'
+    schema = YELLOW_SCHEMA if taxi_type == 'yellow' else GREEN_SCHEMA
+
+    start, end = _month_bounds(month)
+    month_us = int((end - start).astype(np.int64))
+    pickup = start + rng.integers(0, month_us, rows).astype('timedelta64[us]')
+    duration = rng.gamma(2.0, 7.0, rows) * 60_000_000
+    dropoff = pickup + duration.astype(np.int64).astype('timedelta64[us]')
+
+    trip_distance = np.round(rng.gamma(1.6, 2.0, rows), 2)
+    fare_amount = np.round(3.0 + trip_distance * 2.5 + rng.normal(0, 1.5, rows).clip(-2, None), 2)
+    tip_amount = np.round(np.where(rng.random(rows) < 0.7, fare_amount * rng.uniform(0, 0.3, rows), 0.0), 2)
+    tolls_amount = np.where(rng.random(rows) < 0.05, 6.94, 0.0)
+    congestion_surcharge = np.where(rng.random(rows) < 0.8, 2.5, 0.0)
+    airport_fee = np.where(rng.random(rows) < 0.08, 1.75, 0.0)
+    total_amount = np.round(fare_amount + 1.0 + 0.5 + tip_amount + tolls_amount + 1.0 + congestion_surcharge, 2)
+
+    columns = {
+        'VendorID': rng.integers(1, 3, rows).astype(np.int32),
+        f'{prefix}_pickup_datetime': pickup,
+        f'{prefix}_dropoff_datetime': dropoff,
+        'passenger_count': rng.choice([1, 1, 1, 1, 2, 2, 3, 4, 5, 6], rows).astype(np.float64),
+        'trip_distance': trip_distance,
+        'RatecodeID': rng.choice([1, 1, 1, 1, 1, 1, 2, 3, 5, 99], rows).astype(np.float64),
+        'store_and_fwd_flag': np.where(rng.random(rows) < 0.005, 'Y', 'N').astype(object),
+        'PULocationID': rng.integers(1, 266, rows).astype(np.int32),
+        'DOLocationID': rng.integers(1, 266, rows).astype(np.int32),
+        'payment_type': rng.choice([1, 1, 1, 2, 2, 3, 4], rows).astype(np.float64),
+        'fare_amount': fare_amount,
+        'extra': rng.choice([0.0, 0.5, 1.0, 2.5], rows),
+        'mta_tax': np.full(rows, 0.5),
+        'tip_amount': tip_amount,
+        'tolls_amount': tolls_amount,
+        'improvement_surcharge': np.full(rows, 1.0),
+        'total_amount': total_amount,
+        'congestion_surcharge': congestion_surcharge,
+        'Airport_fee': airport_fee,
+        'cbd_congestion_fee': np.where(rng.random(rows) < 0.3, 0.75, 0.0),
+        'ehail_fee': np.full(rows, np.nan),
+        'trip_type': rng.choice([1.0, 1.0, 1.0, 2.0], rows)
+    }
+    nulls = {name: np.zeros(rows, dtype=bool) for name in columns}
+    nulls['ehail_fee'][:] = True
+
+    # Rows the uploaders have to clean up or filter out
+    dirty = np.flatnonzero(rng.random(rows) < dirty_fraction)
+    for row, kind in zip(dirty, rng.integers(0, 6, len(dirty))):
+        if kind == 0:
+            # Missing optional values, as in the TLC's "unknown" records
+            for col in ('passenger_count', 'RatecodeID', 'store_and_fwd_flag', 'congestion_surcharge', 'Airport_fee'):
+                nulls[col][row] = True
+        elif kind == 1:
+            columns['trip_distance'][row] = 0.0
+        elif kind == 2:
+            columns['trip_distance'][row] = rng.uniform(500, 100_000)
+        elif kind == 3:
+            columns[f'{prefix}_dropoff_datetime'][row] = columns[f'{prefix}_pickup_datetime'][row] - np.timedelta64(5, 'm')
+        elif kind == 4:
+            columns['fare_amount'][row] = -columns['fare_amount'][row]
+            columns['total_amount'][row] = -columns['total_amount'][row]
+        else:
+            columns[f'{prefix}_dropoff_datetime'][row] += np.timedelta64(2, 'D')
+
+    # Stray pickups from other months, including the bogus 2000s dates found in real files
+    strays = np.flatnonzero(rng.random(rows) < stray_fraction)
+    stray_starts = rng.choice(np.array(['2008-12-31', '2009-01-01', f'{month}-01'], dtype='datetime64[us]'), len(strays))
+    stray_offsets = rng.integers(-40, 40, len(strays)).astype('timedelta64[D]')
+    columns[f'{prefix}_pickup_datetime'][strays] = stray_starts + stray_offsets
+    columns[f'{prefix}_dropoff_datetime'][strays] = columns[f'{prefix}_pickup_datetime'][strays] + np.timedelta64(15, 'm')
+
+    renames = CASING_VARIANTS[casing]
+    arrays, fields = [], []
+    for name, dtype in schema:
+        values = columns[name]
+        mask = nulls[name] if nulls[name].any() else None
+        if pa.types.is_integer(dtype) and values.dtype.kind == 'f':
+            values = values.astype(np.int64)
+        arrays.append(pa.array(values, type=dtype, mask=mask))
+        fields.append(pa.field(renames.get(name, name), dtype))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_month(output_dir: str, taxi_type: str, month: str, rows: int, row_group_size: int,
+                compression: str = 'snappy', **kwargs) -> str:
+    """Generate one month and write it as <taxi_type>_tripdata_<month>.parquet."""
+    table = generate_trips(taxi_type, month, rows, **kwargs)
+    path = os.path.join(output_dir, f"{taxi_type}_tripdata_{month}.parquet")
+    pq.write_table(table, path, row_group_size=row_group_size, compression=compression)
+    return path
+
+
+def month_range(first_month: str, count: int) -> list:
+    first = np.datetime64(first_month, 'M')
+    return [str(first + i) for i in range(count)]
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic NYC TLC trip parquet files.")
+    parser.add_argument('--output', default='synthetic_data', help='Output directory. Defaults to ./synthetic_data.')
+    parser.add_argument('--taxi_type', choices=['yellow', 'green', 'all'], default='all', help='Which taxi feed(s) to generate.')
+    parser.add_argument('--months', type=str, help='Comma-separated months (YYYY-MM). Defaults to --first-month and --count.')
+    parser.add_argument('--first-month', default='2023-01', help='First month when --months is not given. Defaults to 2023-01.')
+    parser.add_argument('--count', type=int, default=1, help='Number of consecutive months when --months is not given.')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows per file. Defaults to 1,000,000.')
+    parser.add_argument('--row-group-size', type=int, default=1_000_000, help='Rows per parquet row group. Defaults to 1,000,000.')
+    parser.add_argument('--compression', default='snappy', help='Parquet compression codec. Defaults to snappy.')
+    parser.add_argument('--dirty-fraction', type=float, default=0.02, help='Share of dirty rows. Defaults to 0.02.')
+    parser.add_argument('--stray-fraction', type=float, default=0.001, help='Share of rows from other months. Defaults to 0.001.')
+    parser.add_argument('--casing', choices=sorted(CASING_VARIANTS), default='standard', help='Column casing variant.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed. Defaults to 0.')
+    args = parser.parse_args(argv)
+
+    months = [m.strip() for m in args.months.split(',')] if args.months else month_range(args.first_month, args.count)
+    taxi_types = ['yellow', 'green'] if args.taxi_type == 'all' else [args.taxi_type]
+    os.makedirs(args.output, exist_ok=True)
+
+    for taxi_type in taxi_types:
+        for i, month in enumerate(months):
+            path = write_month(
+                args.output, taxi_type, month, args.rows, args.row_group_size, args.compression,
+                dirty_fraction=args.dirty_fraction, stray_fraction=args.stray_fraction,
+                casing=args.casing, seed=args.seed + i
+            )
+            print(f"✅ Wrote {path} ({os.path.getsize(path) / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Structured run reports and throughput history for the taxi data uploader.
+
+`uploader.py --report run.json` writes every per-file result together with environment and
+configuration details, and appends one summary line per table to a JSON-lines history file.
+Running this module compares the latest run in a history file against earlier runs:
+
+    python run_report.py upload_history.jsonl --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+from importlib import metadata
+
+DEFAULT_HISTORY_FILE = 'upload_history.jsonl'
+
+# Settings that must match for two runs to be comparable, with defaults for older history entries
+COMPARABLE_KEYS = ('table', 'sink', 'engine', 'workers', 'batch_size', 'dry_run', 'async_insert', 'asyncio',
+                   'pipeline_depth', 'transform_workers', 'insert_workers', 'insert_format', 'insert_compression',
+                   'sort_blocks', 'partition_block_rows', 'partition_block_mb', 'memory_budget_mb')
+COMPARABLE_DEFAULTS = {
+    'sink': 'clickhouse',
+    'dry_run': False,
+    'async_insert': False,
+    'asyncio': False,
+    'pipeline_depth': 0,
+    'transform_workers': 1,
+    'insert_workers': 1,
+    'sort_blocks': False
+}
+# Comparable settings listed by the regression table only when they differ from the default
+DETAIL_KEYS = COMPARABLE_KEYS[COMPARABLE_KEYS.index('pipeline_depth'):]
+
+
+def _package_version(name: str):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment_info() -> dict:
+    """Describe the machine and library versions a run was measured on."""
+    return {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'pyarrow': _package_version('pyarrow'),
+        'pandas': _package_version('pandas'),
+        'clickhouse-connect': _package_version('clickhouse-connect')
+    }
+
+
+def table_totals(results: list, total_size_mb: float, total_elapsed: float) -> dict:
+    """Aggregate per-file results into the same totals `display_summary` prints."""
+    successful = [r for r in results if 'error' not in r]
+    rows_uploaded = sum(r['rows_uploaded'] for r in successful)
+    rows_processed = sum(r['rows_processed'] for r in successful)
+
+    stages = {}
+    for result in successful:
+        for stage, totals in result.get('stages', {}).items():
+            stages[stage] = stages.get(stage, 0.0) + totals['wall_seconds']
+
+    return {
+        'files': len(results),
+        'failed_files': len(results) - len(successful),
+        'rows_processed': rows_processed,
+        'rows_uploaded': rows_uploaded,
+        'rows_filtered': rows_processed - rows_uploaded,
+        'size_mb': total_size_mb,
+        'time_seconds': total_elapsed,
+        'rows_per_second': rows_uploaded / total_elapsed if total_elapsed > 0 else 0,
+        'mb_per_second': total_size_mb / total_elapsed if total_elapsed > 0 else 0,
+        'stage_wall_seconds': stages
+    }
+
+
+def build_report(runs: list, config: dict) -> dict:
+    """
+    Build a run report.
+
+    Args:
+        runs: One dict per table as returned by `TaxiDataUploader.upload_all_files`.
+        config: Uploader and CLI settings used for the run (engine, workers, batch size, ...).
+    """
+    return {
+        'run_id': datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ'),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment_info(),
+        'config': config,
+        'tables': [
+            {
+                'table': run['table'],
+                'totals': table_totals(run['results'], run['total_size_mb'], run['total_elapsed']),
+                'files': run['results']
+            }
+            for run in runs
+        ]
+    }
+
+
+def write_report(report: dict, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+
+
+def append_history(report: dict, history_path: str) -> None:
+    """Append one summary line per table to the history file."""
+    with open(history_path, 'a', encoding='utf-8') as f:
+        for table in report['tables']:
+            entry = {
+                'run_id': report['run_id'],
+                'created_at': report['created_at'],
+                'table': table['table'],
+                **{key: report['config'].get(key, COMPARABLE_DEFAULTS.get(key)) for key in COMPARABLE_KEYS if key != 'table'},
+                'cpu_count': report['environment']['cpu_count'],
+                'versions': {key: report['environment'][key] for key in ('pyarrow', 'pandas', 'clickhouse-connect')},
+                **table['totals']
+            }
+            f.write(json.dumps(entry, default=str) + '\n')
+
+
+def load_history(history_path: str) -> list:
+    with open(history_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare_latest(history: list, threshold: float = 0.1, window: int = 5) -> list:
+    """
+    Compare the latest run of each comparable configuration against earlier runs.
+
+    The baseline is the median rows/sec of up to `window` previous runs with the same
+    `COMPARABLE_KEYS`: table, sink scheme, engine, workers, batch size and every pipeline,
+    insert and block setting. A drop of more than `threshold` is a regression.
+
+    Returns:
+        One dict per configuration with the latest and baseline throughput.
+    """
+    groups = {}
+    for entry in history:
+        key = tuple(entry.get(key, COMPARABLE_DEFAULTS.get(key)) for key in COMPARABLE_KEYS)
+        groups.setdefault(key, []).append(entry)
+
+    comparisons = []
+    for key, entries in groups.items():
+        latest, previous = entries[-1], entries[:-1][-window:]
+        previous = [entry for entry in previous if entry['rows_per_second'] > 0]
+        if not previous:
+            continue
+        baseline = statistics.median(entry['rows_per_second'] for entry in previous)
+        change = (latest['rows_per_second'] - baseline) / baseline if baseline > 0 else 0
+        comparisons.append({
+            **dict(zip(COMPARABLE_KEYS, key)),
+            'run_id': latest['run_id'],
+            'rows_per_second': latest['rows_per_second'],
+            'baseline_rows_per_second': baseline,
+            'baseline_runs': len(previous),
+            'change': change,
+            'regression': change < -threshold
+        })
+    return comparisons
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Flag throughput regressions between uploader runs.")
+    parser.add_argument('history', nargs='?', default=DEFAULT_HISTORY_FILE, help='History file written by uploader.py --report.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative rows/sec drop treated as a regression. Defaults to 0.1 (10%%).')
+    parser.add_argument('--window', type=int, default=5, help='Number of previous runs used as the baseline. Defaults to 5.')
+    args = parser.parse_args(argv)
+
+    comparisons = compare_latest(load_history(args.history), args.threshold, args.window)
+    if not comparisons:
+        print("ℹ️  Not enough comparable runs in the history yet.")
+        return 0
+
+    print(f"{'Table':<20} {'Engine':<8} {'Workers':>7} {'Batch':>8} {'Rows/sec':>12} {'Baseline':>12} {'Change':>8}")
+    for c in comparisons:
+        flag = '⚠️  REGRESSION' if c['regression'] else '✅'
+        if c['dry_run']:
+            flag += ' (dry run)'
+        if c['async_insert']:
+            flag += ' (async insert)'
+        if c['asyncio']:
+            flag += ' (asyncio)'
+        if c['sink'] != COMPARABLE_DEFAULTS['sink']:
+            flag += f" ({c['sink']})"
+        details = [f"{key}={c[key]}" for key in DETAIL_KEYS if c[key] != COMPARABLE_DEFAULTS.get(key)]
+        if details:
+            flag += f" ({', '.join(details)})"
+        print(f"{c['table']:<20} {str(c['engine']):<8} {str(c['workers']):>7} {str(c['batch_size']):>8} "
+              f"{c['rows_per_second']:>12,.0f} {c['baseline_rows_per_second']:>12,.0f} {c['change']:>+7.1%} {flag}")
+    return 1 if any(c['regression'] for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# The uploader modules are flat scripts imported as `import sinks`, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_tlc_data  # noqa: E402
+import sinks  # noqa: E402
+from uploader import YellowTaxiUploader  # noqa: E402
+
+TRIP_ROWS = 6000
+
+
+@pytest.fixture(scope='session')
+def trip_file(tmp_path_factory) -> str:
+    """A synthetic yellow month with small row groups and plenty of dirty and stray rows."""
+    return generate_tlc_data.write_month(str(tmp_path_factory.mktemp('data')), 'yellow', '2023-03', TRIP_ROWS,
+                                         row_group_size=1500, dirty_fraction=0.05, stray_fraction=0.02)
+
+
+@pytest.fixture
+def upload():
+    """Upload one file to a memory sink (or the given one) in batches of 700 rows."""
+    def upload(file_path: str, sink=None, **options):
+        sink = sinks.MemorySink() if sink is None else sink
+        uploader = YellowTaxiUploader('memory://', client=sink, **{'batch_size': 700, **options})
+        return uploader, uploader.upload_file(file_path), sink
+    return upload
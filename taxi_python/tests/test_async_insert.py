@@ -0,0 +1,89 @@
+import json
+import re
+
+import pytest
+
+import sinks
+import uploader as uploader_module
+
+TABLE = 'yellow_taxi_trips'
+
+
+class BufferingSink(sinks.MemorySink):
+    """Memory sink that keeps every async insert in the server buffer for the next `polls` pending-insert queries."""
+    def __init__(self, polls: int = 3):
+        super().__init__()
+        self.polls = polls
+        self.buffered = {}
+        self.pending_queries = []
+
+    def _insert(self, table: str, block, **kwargs) -> None:
+        self.buffered[kwargs['settings']['query_id']] = self.polls
+        super()._insert(table, block, **kwargs)
+
+    def query(self, query: str, *args, **kwargs):
+        if 'system.asynchronous_inserts' not in query:
+            return super().query(query, *args, **kwargs)
+        self.pending_queries.append(query)
+        prefix = re.search(r"startsWith\(query_id, '([^']+)'\)", query).group(1)
+        pending = [query_id for query_id, polls in self.buffered.items() if query_id.startswith(prefix) and polls > 0]
+        for query_id in pending:
+            self.buffered[query_id] -= 1
+        return sinks.QueryResult([[len(pending)]])
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(uploader_module.time, 'sleep', lambda seconds: None)
+
+
+def test_waits_until_the_files_inserts_are_flushed(trip_file, upload):
+    sink = BufferingSink(polls=3)
+    # Rows loaded by someone else must not end the wait early
+    sink.rows[TABLE] = 10_000_000
+    _, result, _ = upload(trip_file, sink, async_insert=True, async_insert_wait=False)
+
+    assert 'error' not in result
+    assert result['visibility_lag_seconds'] >= 0
+    assert len(sink.pending_queries) == 4
+    assert result['visible_seconds'] >= result['acknowledged_seconds']
+
+    settings = [insert['kwargs']['settings'] for insert in sink.blocks]
+    prefixes = {setting['query_id'].rsplit('-', 1)[0] for setting in settings}
+    assert len(prefixes) == 1 and prefixes.pop().startswith(f'{TABLE}-')
+    assert all(setting['async_insert'] == 1 and setting['wait_for_async_insert'] == 0 for setting in settings)
+
+
+def test_buffer_settings_are_passed_through(trip_file, upload):
+    _, _, sink = upload(trip_file, BufferingSink(polls=0), async_insert=True,
+                        async_insert_max_data_mb=4, async_insert_busy_timeout_ms=500)
+
+    settings = sink.blocks[0]['kwargs']['settings']
+    assert settings['wait_for_async_insert'] == 1
+    assert settings['async_insert_max_data_size'] == 4 * 1024 * 1024
+    assert settings['async_insert_busy_timeout_ms'] == 500
+
+
+def test_sync_inserts_are_not_polled(trip_file, upload):
+    sink = BufferingSink()
+    _, result, _ = upload(trip_file, sink)
+
+    assert sink.pending_queries == []
+    assert 'visibility_lag_seconds' not in result
+    assert all('query_id' not in insert['kwargs']['settings'] for insert in sink.blocks)
+
+
+def test_unflushed_inserts_time_out(trip_file, upload, monkeypatch):
+    monkeypatch.setattr(uploader_module.YellowTaxiUploader, 'ASYNC_VISIBILITY_TIMEOUT_SECONDS', 0)
+    _, result, _ = upload(trip_file, BufferingSink(polls=10**6), async_insert=True, async_insert_wait=False)
+    assert 'still not flushed' in result['error']
+
+
+def test_unacknowledged_inserts_only_mark_the_file(trip_file, upload, tmp_path):
+    manifest_path = tmp_path / 'manifest.jsonl'
+    upload(trip_file, BufferingSink(polls=0), async_insert=True, async_insert_wait=False,
+           manifest_path=str(manifest_path))
+
+    entries = [json.loads(line) for line in manifest_path.read_text(encoding='utf-8').splitlines()]
+    assert not [entry for entry in entries if 'batch' in entry or 'row_group' in entry]
+    assert entries[-1]['status'] == 'complete'
@@ -0,0 +1,101 @@
+import asyncio
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import generate_tlc_data
+import sinks
+from async_uploader import AsyncTaxiDataUploader
+from uploader import YellowTaxiUploader
+
+TABLE = 'yellow_taxi_trips'
+
+
+class FailingSink(sinks.MemorySink):
+    """Memory sink that fails every insert after the first `fail_after`."""
+    def __init__(self, fail_after: int = None):
+        super().__init__()
+        self.fail_after = fail_after
+        self.inserts = 0
+
+    def _insert(self, table: str, block, **kwargs) -> None:
+        with self._lock:
+            self.inserts += 1
+            if self.fail_after is not None and self.inserts > self.fail_after:
+                raise ConnectionError('injected connection reset')
+        super()._insert(table, block, **kwargs)
+
+
+def loaded(*sinks_) -> pd.DataFrame:
+    df = pa.concat_tables([block for sink in sinks_ for block in sink.tables(TABLE)]).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+def upload_async(file_paths: list, sink=None, **options) -> tuple:
+    """Upload files concurrently through the asyncio uploader into a memory sink, in batches of 700 rows."""
+    sink = sinks.MemorySink() if sink is None else sink
+
+    async def run():
+        async with AsyncTaxiDataUploader(YellowTaxiUploader, 'memory://', client=sinks.AsyncSink(sink),
+                                         **{'batch_size': 700, **options}) as uploader:
+            return await asyncio.gather(*(uploader.upload_file(file_path) for file_path in file_paths))
+
+    return asyncio.run(run()), sink
+
+
+@pytest.fixture(scope='module')
+def months(tmp_path_factory) -> list:
+    output_dir = str(tmp_path_factory.mktemp('months'))
+    return [generate_tlc_data.write_month(output_dir, 'yellow', month, 3000, row_group_size=1000, seed=i)
+            for i, month in enumerate(['2023-06', '2023-07', '2023-08'])]
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+def test_concurrent_files_load_the_same_rows(months, upload, executor, engine):
+    sync_sinks = [upload(file_path, engine=engine)[2] for file_path in months]
+    results, sink = upload_async(months, engine=engine, executor=executor, max_concurrent_files=2,
+                                 max_concurrent_inserts=3)
+
+    assert not [result['error'] for result in results if 'error' in result]
+    pd.testing.assert_frame_equal(loaded(sink), loaded(*sync_sinks))
+
+
+def test_parquet_inserts(trip_file, upload):
+    _, _, sync_sink = upload(trip_file)
+    [result], sink = upload_async([trip_file], insert_format='parquet', executor='process')
+
+    assert 'error' not in result
+    assert all(insert['kwargs']['fmt'] == 'Parquet' for insert in sink.blocks)
+    pd.testing.assert_frame_equal(loaded(sink), loaded(sync_sink))
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_insert_error_is_reported_per_file(months, executor):
+    results, _ = upload_async(months[:2], FailingSink(fail_after=3), executor=executor, insert_retries=0,
+                              max_concurrent_inserts=1)
+    assert all('injected connection reset' in result['error'] for result in results)
+
+
+def test_resume_after_failure_loads_every_row_once(trip_file, upload, tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    _, _, sync_sink = upload(trip_file)
+
+    [failed], first_sink = upload_async([trip_file], FailingSink(fail_after=4), manifest_path=manifest_path,
+                                        insert_retries=0, max_concurrent_inserts=2)
+    [resumed], second_sink = upload_async([trip_file], manifest_path=manifest_path, max_concurrent_inserts=2)
+
+    assert 'error' in failed and 'error' not in resumed
+    pd.testing.assert_frame_equal(loaded(first_sink, second_sink), loaded(sync_sink))
+
+
+@pytest.mark.parametrize('options', [{'insert_workers': 2}, {'replace': True}, {'executor': 'fork'}])
+def test_unsupported_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        AsyncTaxiDataUploader(YellowTaxiUploader, 'memory://', **options)
+
+
+def test_only_null_and_memory_sinks(tmp_path):
+    with pytest.raises(ValueError, match='only writes to ClickHouse'):
+        AsyncTaxiDataUploader(YellowTaxiUploader, f'parquet://{tmp_path}')
@@ -0,0 +1,128 @@
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import sinks
+import uploader as uploader_module
+from uploader import classify_insert_error
+
+TABLE = 'yellow_taxi_trips'
+
+
+class CodedError(Exception):
+    """A server error as raised by clickhouse-connect, with its ClickHouse error code."""
+    def __init__(self, code: int):
+        super().__init__(f"Code: {code}. DB::Exception: injected")
+        self.code = code
+
+
+class FlakySink(sinks.MemorySink):
+    """
+    Memory sink that fails on purpose: every insert after the first `fail_after`, every
+    `retry_every`-th insert with a retryable error, and blocks over `max_rows` with an error
+    that asks for a split.
+    """
+    def __init__(self, fail_after: int = None, retry_every: int = None, max_rows: int = None):
+        super().__init__()
+        self.fail_after = fail_after
+        self.retry_every = retry_every
+        self.max_rows = max_rows
+        self.calls = 0
+
+    def _insert(self, table: str, block, **kwargs) -> None:
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise CodedError(210)
+        if self.max_rows is not None and len(block) > self.max_rows:
+            raise CodedError(241)
+        if self.retry_every and self.calls % self.retry_every == 0:
+            raise CodedError(252)
+        super()._insert(table, block, **kwargs)
+
+
+def loaded(sink) -> pd.DataFrame:
+    df = pa.concat_tables(sink.tables(TABLE)).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+def tokens(sink) -> list:
+    return [insert['kwargs']['settings']['insert_deduplication_token'] for insert in sink.blocks]
+
+
+def test_retries_and_splits_on_error_codes(trip_file, upload):
+    _, clean, clean_sink = upload(trip_file)
+    sink = FlakySink(retry_every=4, max_rows=300)
+    _, result, _ = upload(trip_file, sink, insert_retries=5, retry_backoff_seconds=0)
+
+    assert 'error' not in result
+    assert result['insert_retries'] > 0
+    assert result['block_splits'] > 0
+    assert result['rows_uploaded'] == clean['rows_uploaded']
+    pd.testing.assert_frame_equal(loaded(sink), loaded(clean_sink))
+    assert len(tokens(sink)) == len(set(tokens(sink)))
+    assert any(token.endswith(('-0', '-1')) for token in tokens(sink))
+
+
+def test_permanent_error_is_not_retried(trip_file, upload):
+    class UnknownTableSink(sinks.MemorySink):
+        def _insert(self, table, block, **kwargs):
+            raise CodedError(60)
+
+    _, result, sink = upload(trip_file, UnknownTableSink(), insert_retries=5, retry_backoff_seconds=0)
+
+    assert 'error' in result
+    assert sink.rows == {}
+
+
+@pytest.mark.parametrize('error, kind', [
+    (CodedError(252), 'retry'),
+    (CodedError(241), 'split'),
+    (CodedError(60), None),
+    # Older clickhouse-connect releases only carry the code in the message
+    (Exception("HTTPDriver received ClickHouse error code 241\n Code: 241. DB::Exception: Memory limit"), 'split'),
+    (Exception("Code: 202. DB::Exception: Too many simultaneous queries"), 'retry'),
+    (ConnectionError("connection reset"), 'retry'),
+])
+def test_classify_insert_error(error, kind):
+    assert classify_insert_error(error) == kind
+
+
+def test_reloads_get_new_tokens(trip_file, upload):
+    # e.g. a reload after DROP PARTITION must not be deduplicated against the first load
+    _, _, first = upload(trip_file)
+    _, _, second = upload(trip_file)
+
+    assert not set(tokens(first)) & set(tokens(second))
+
+
+def test_manifest_resume_reuses_the_interrupted_run_tokens(trip_file, upload, tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    sink = FlakySink(fail_after=4)
+    _, failed, _ = upload(trip_file, sink, manifest_path=manifest_path, insert_retries=1, retry_backoff_seconds=0)
+    assert 'error' in failed
+    interrupted = set(tokens(sink))
+
+    sink.fail_after = None
+    _, resumed, _ = upload(trip_file, sink, manifest_path=manifest_path)
+    assert 'error' not in resumed
+    resumed_tokens = tokens(sink)[len(interrupted):]
+
+    prefix = next(iter(interrupted)).rsplit(':', 1)[0]
+    assert all(token.startswith(prefix + ':') for token in resumed_tokens)
+    assert not interrupted & set(resumed_tokens)
+
+
+def test_token_prefix_does_not_depend_on_today(trip_file, monkeypatch):
+    uploader = uploader_module.YellowTaxiUploader('memory://')
+    monkeypatch.setattr(uploader_module.uuid, 'uuid4', lambda: uploader_module.uuid.UUID(int=1))
+    today = uploader._token_prefix(trip_file, 700)
+
+    class Tomorrow(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date.today() + datetime.timedelta(days=1)
+
+    monkeypatch.setattr(uploader_module, 'date', Tomorrow)
+    assert uploader._token_prefix(trip_file, 700) == today
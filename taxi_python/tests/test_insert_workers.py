@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import sinks
+
+TABLE = 'yellow_taxi_trips'
+
+
+class SlowSink(sinks.MemorySink):
+    """Memory sink whose inserts take a while, recording how many overlap."""
+    def __init__(self):
+        super().__init__()
+        self.running = 0
+        self.max_running = 0
+        self._running_lock = threading.Lock()
+
+    def _insert(self, table: str, block, **kwargs) -> None:
+        with self._running_lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        super()._insert(table, block, **kwargs)
+        with self._running_lock:
+            self.running -= 1
+
+
+def loaded(sink) -> pd.DataFrame:
+    df = pa.concat_tables(sink.tables(TABLE)).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+def test_parallel_sorted_inserts_load_the_same_rows(trip_file, upload, engine):
+    _, _, serial_sink = upload(trip_file, engine=engine)
+    uploader, result, sink = upload(trip_file, SlowSink(), engine=engine, insert_workers=3, sort_blocks=True)
+
+    assert 'error' not in result
+    assert sink.max_running > 1
+    pd.testing.assert_frame_equal(loaded(sink), loaded(serial_sink))
+
+    keys = uploader._get_sorting_key()
+    assert keys
+    for block in sink.tables(TABLE):
+        df = block.to_pandas()
+        pd.testing.assert_frame_equal(df, df.sort_values(keys, ignore_index=True))
+
+
+def test_connection_stats_cover_every_insert(trip_file, upload):
+    _, result, _ = upload(trip_file, SlowSink(), insert_workers=3, max_inflight_blocks=4)
+
+    connections = result['connections']
+    assert [stats['connection'] for stats in connections] == [0, 1, 2]
+    assert sum(stats['inserts'] for stats in connections) == result['batches_processed']
+    assert sum(stats['rows'] for stats in connections) == result['rows_uploaded']
+    assert all(stats['p50_ms'] <= stats['p95_ms'] <= stats['max_ms'] for stats in connections)
+
+
+def test_single_worker_reports_no_connections(trip_file, upload):
+    _, result, _ = upload(trip_file)
+    assert 'connections' not in result
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import sinks
+from uploader import LoadManifest
+
+TABLE = 'yellow_taxi_trips'
+
+
+class FailingSink(sinks.MemorySink):
+    """Memory sink that fails every insert after the first `fail_after`, like a dropped connection."""
+    def __init__(self, fail_after: int = None):
+        super().__init__()
+        self.fail_after = fail_after
+        self.inserts = 0
+
+    def _insert(self, table: str, block, **kwargs) -> None:
+        with self._lock:
+            self.inserts += 1
+            if self.fail_after is not None and self.inserts > self.fail_after:
+                raise ConnectionError('injected connection reset')
+        super()._insert(table, block, **kwargs)
+
+
+def loaded(*sinks_) -> pd.DataFrame:
+    df = pa.concat_tables([block for sink in sinks_ for block in sink.tables(TABLE)]).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+@pytest.fixture
+def own_file(trip_file, tmp_path) -> str:
+    """A private copy of the trip file, free to be touched."""
+    return shutil.copy(trip_file, tmp_path / os.path.basename(trip_file))
+
+
+@pytest.mark.parametrize('options', [{}, {'engine': 'arrow', 'insert_workers': 2}])
+def test_resume_after_failure_loads_every_row_once(trip_file, upload, tmp_path, options):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    _, _, clean_sink = upload(trip_file, **options)
+
+    _, failed, first_sink = upload(trip_file, FailingSink(fail_after=4), manifest_path=manifest_path,
+                                   insert_retries=0, **options)
+    assert 'error' in failed
+
+    _, resumed, second_sink = upload(trip_file, manifest_path=manifest_path, **options)
+    assert 'error' not in resumed
+    assert resumed['row_groups_resumed'] + resumed['batches_resumed'] > 0
+    pd.testing.assert_frame_equal(loaded(first_sink, second_sink), loaded(clean_sink))
+
+    _, rerun, rerun_sink = upload(trip_file, manifest_path=manifest_path, **options)
+    assert rerun['skipped']
+    assert not rerun_sink.tables(TABLE)
+
+
+def test_changed_file_is_loaded_again(own_file, upload, tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    _, first, _ = upload(own_file, manifest_path=manifest_path)
+
+    stat = os.stat(own_file)
+    os.utime(own_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    _, second, _ = upload(own_file, manifest_path=manifest_path)
+
+    assert not second.get('skipped')
+    assert second['rows_uploaded'] == first['rows_uploaded']
+    assert second['row_groups_resumed'] == second['batches_resumed'] == 0
+
+
+def test_truncated_manifest_line_is_ignored(trip_file, upload, tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    upload(trip_file, manifest_path=manifest_path)
+    with open(manifest_path, 'a', encoding='utf-8') as f:
+        f.write('{"table": "yellow_taxi_trips", "file": ')
+
+    assert LoadManifest(manifest_path).is_file_complete(TABLE, trip_file)
+    _, result, _ = upload(trip_file, manifest_path=manifest_path)
+    assert result['skipped']
+
+
+def test_batches_only_resume_with_the_same_batch_size(trip_file, tmp_path):
+    manifest = LoadManifest(str(tmp_path / 'manifest.jsonl'))
+    manifest.mark_batch(TABLE, trip_file, 0, 0, 700)
+    manifest.mark_batch(TABLE, trip_file, 0, 1, 700, last=True)
+
+    reloaded = LoadManifest(manifest.path)
+    assert reloaded.completed_batches(TABLE, trip_file, 700) == {(0, 0), (0, 1)}
+    assert reloaded.completed_batches(TABLE, trip_file, 500) == set()
+    assert reloaded.completed_row_groups(TABLE, trip_file) == {0}
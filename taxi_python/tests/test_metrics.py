@@ -0,0 +1,62 @@
+import urllib.request
+
+import pytest
+
+import upload_metrics
+
+
+def samples(body: str, name: str) -> float:
+    """Sum of all samples of one metric in the text exposition format."""
+    return sum(float(line.rsplit(' ', 1)[1]) for line in body.splitlines() if line.startswith(name + '{'))
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    upload_metrics.REGISTRY.snapshot(reset=True)
+
+
+def test_metrics_endpoint_reports_the_upload(trip_file, upload):
+    server = upload_metrics.start_http_server(0, '127.0.0.1')
+    try:
+        _, result, _ = upload(trip_file, collect_metrics=True)
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5) as response:
+            body = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert samples(body, 'taxi_uploader_rows_inserted_total') == result['rows_uploaded']
+    assert samples(body, 'taxi_uploader_rows_read_total') == result['rows_processed']
+    assert samples(body, 'taxi_uploader_rows_filtered_total') == result['rows_filtered']
+    assert samples(body, 'taxi_uploader_insert_latency_seconds_count') == result['batches_processed']
+    assert 'taxi_uploader_insert_latency_seconds_bucket{' in body
+
+
+def test_textfile_is_written_after_the_file(trip_file, upload, tmp_path):
+    path = tmp_path / 'taxi_uploader.prom'
+    _, result, _ = upload(trip_file, metrics_textfile=str(path))
+
+    body = path.read_text(encoding='utf-8')
+    assert samples(body, 'taxi_uploader_rows_inserted_total') == result['rows_uploaded']
+
+
+def test_metrics_are_off_by_default(trip_file, upload):
+    upload(trip_file)
+    body = upload_metrics.REGISTRY.render()
+    assert samples(body, 'taxi_uploader_rows_inserted_total') == 0
+
+
+def test_worker_snapshots_merge_without_double_counting():
+    worker = upload_metrics.MetricsRegistry()
+    worker.describe('rows_total', 'counter', 'Rows.')
+    worker.describe('latency_seconds', 'histogram', 'Latency.', buckets=(0.1, 1.0))
+    parent = upload_metrics.MetricsRegistry()
+
+    for _ in range(2):
+        worker.inc('rows_total', {'file': 'a'}, 10)
+        worker.observe('latency_seconds', value=0.5)
+        parent.merge(worker.snapshot(reset=True))
+
+    body = parent.render()
+    assert 'rows_total{file="a"} 20' in body
+    assert 'latency_seconds_count 2' in body
@@ -0,0 +1,51 @@
+import os
+
+import generate_tlc_data
+import sinks
+from uploader import YellowTaxiUploader
+
+TABLE = 'yellow_taxi_trips'
+
+
+class ServerClient:
+    """Stands in for a ClickHouse client: not a local sink, so insert workers get clients of their own."""
+    def __init__(self):
+        self.sink = sinks.MemorySink()
+
+    def __getattr__(self, name):
+        return getattr(self.sink, name)
+
+
+def test_insert_clients_are_opened_on_first_upload(trip_file, monkeypatch):
+    created = []
+
+    def create_client(self, connection_string):
+        created.append(ServerClient())
+        return created[-1]
+
+    monkeypatch.setattr(YellowTaxiUploader, '_create_client', create_client)
+
+    uploader = YellowTaxiUploader('clickhouse://localhost', insert_workers=3, batch_size=700)
+    # The parent of a --workers run only verifies the table and reports
+    assert len(created) == 1
+
+    result = uploader.upload_file(trip_file)
+    assert 'error' not in result
+    assert len(created) == 4
+    assert sum(client.sink.rows.get(TABLE, 0) for client in created[1:]) == result['rows_uploaded']
+    assert created[0].sink.rows == {}
+
+
+def test_worker_processes_upload_every_file(tmp_path):
+    paths = [generate_tlc_data.write_month(str(tmp_path), 'yellow', month, 2000, row_group_size=1000)
+             for month in ('2023-01', '2023-02', '2023-03')]
+    uploader = YellowTaxiUploader('null://', batch_size=700)
+
+    summary = uploader.upload_all_files(str(tmp_path), 'yellow_tripdata_*.parquet', workers=2)
+
+    results = summary['results']
+    assert [result['file'] for result in results] == [os.path.basename(path) for path in paths]
+    assert all('error' not in result and result['rows_uploaded'] > 0 for result in results)
+    # Each worker process loaded into its own sink; the parent inserted nothing
+    assert uploader.client.rows == {}
+    assert uploader._client_pool is None
@@ -0,0 +1,102 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import sinks
+from uploader import PartitionBuffer
+
+TABLE = 'yellow_taxi_trips'
+
+
+class FlakyServerSink(sinks.MemorySink):
+    """
+    Memory sink that drops blocks whose deduplication token it has seen, as the server does,
+    and whose inserts fail after the first `fail_after`.
+    """
+    def __init__(self, fail_after: int = None):
+        super().__init__()
+        self.fail_after = fail_after
+        self.calls = 0
+        self.tokens = set()
+
+    def _insert(self, table: str, block, **kwargs) -> None:
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise ConnectionError("connection reset")
+        token = kwargs['settings']['insert_deduplication_token']
+        if token not in self.tokens:
+            self.tokens.add(token)
+            super()._insert(table, block, **kwargs)
+
+
+def months(sink, column: str) -> list:
+    return [set(pd.to_datetime(table[column].to_pandas()).dt.strftime('%Y%m')) for table in sink.tables(TABLE)]
+
+
+def loaded(sink) -> pd.DataFrame:
+    df = pa.concat_tables(sink.tables(TABLE)).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+def test_partition_blocks_hold_a_single_month(trip_file, upload, engine):
+    uploader, result, sink = upload(trip_file, engine=engine, partition_block_rows=2000)
+
+    assert 'error' not in result
+    assert sink.rows[TABLE] == result['rows_uploaded']
+    block_months = months(sink, uploader.transform_spec.pickup_column)
+    assert all(len(block) == 1 for block in block_months)
+    # Stray rows from other months end up in blocks of their own
+    assert len(set.union(*block_months)) > 1
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+def test_blocks_are_cut_at_the_row_limit(trip_file, upload, engine):
+    uploader, _, sink = upload(trip_file, engine=engine, partition_block_rows=1000)
+
+    sizes = {}
+    for block_months, table in zip(months(sink, uploader.transform_spec.pickup_column), sink.tables(TABLE)):
+        sizes.setdefault(block_months.pop(), []).append(table.num_rows)
+    # Only the rows left over at the end of the file make a partition's last block smaller
+    assert max(sizes['202303']) == 1000
+    assert all(size == 1000 for partition_sizes in sizes.values() for size in partition_sizes[:-1])
+    assert all(partition_sizes[-1] <= 1000 for partition_sizes in sizes.values())
+
+
+def test_blocks_stay_under_the_byte_limit():
+    buffer = PartitionBuffer('pickup', max_block_bytes=10_000)
+    batch = pa.table({'pickup': pa.array([pd.Timestamp('2023-03-01')] * 700, pa.timestamp('us')),
+                      'fare': pa.array([1.0] * 700)})
+    ready = [block for index in range(10) for _, block, _ in buffer.add(batch, (0, index))]
+
+    assert ready
+    assert all(block.nbytes <= 10_000 for block in ready)
+    # Row ranges of a split batch line up across blocks
+    _, _, parts = buffer.drain()[0]
+    assert parts[0][1] > 0
+
+
+@pytest.mark.parametrize('fail_after', [2, 5, 9])
+def test_manifest_resume_with_partition_blocks_loads_every_row_once(trip_file, upload, tmp_path, fail_after):
+    _, _, clean_sink = upload(trip_file, partition_block_rows=1000)
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    options = {'manifest_path': manifest_path, 'partition_block_rows': 1000, 'insert_retries': 1, 'retry_backoff_seconds': 0}
+    sink = FlakyServerSink(fail_after)
+
+    _, failed, _ = upload(trip_file, sink, **options)
+    assert 'error' in failed
+    sink.fail_after = None
+    _, resumed, _ = upload(trip_file, sink, **options)
+
+    assert 'error' not in resumed
+    if fail_after > 2:
+        # Batches were recorded as blocks filled, not only once the file was done
+        assert resumed['row_groups_resumed'] + resumed['batches_resumed'] > 0
+    pd.testing.assert_frame_equal(loaded(sink), loaded(clean_sink))
+
+
+def test_blocks_stay_under_the_limit_with_a_manifest(trip_file, upload, tmp_path):
+    _, result, sink = upload(trip_file, manifest_path=str(tmp_path / 'manifest.jsonl'), partition_block_rows=1000)
+
+    assert 'error' not in result
+    assert max(table.num_rows for table in sink.tables(TABLE)) <= 1000
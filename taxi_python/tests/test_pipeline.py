@@ -0,0 +1,65 @@
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from uploader import YellowTaxiUploader
+
+TABLE = 'yellow_taxi_trips'
+
+
+def loaded(sink) -> pd.DataFrame:
+    df = pa.concat_tables(sink.tables(TABLE)).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+@pytest.mark.parametrize('options', [
+    {'pipeline_depth': 2},
+    {'pipeline_depth': 1, 'transform_workers': 3},
+    {'pipeline_depth': 2, 'transform_workers': 2, 'engine': 'arrow'},
+])
+def test_pipeline_loads_the_same_rows(trip_file, upload, options):
+    _, sequential, sequential_sink = upload(trip_file, engine=options.get('engine', 'pandas'))
+    _, result, sink = upload(trip_file, **options)
+
+    assert 'error' not in result
+    assert result['rows_uploaded'] == sequential['rows_uploaded']
+    assert result['rows_filtered'] == sequential['rows_filtered']
+    pd.testing.assert_frame_equal(loaded(sink), loaded(sequential_sink))
+
+
+def test_queue_depth_stays_within_capacity(trip_file, upload):
+    _, result, _ = upload(trip_file, pipeline_depth=2, transform_workers=2)
+
+    assert set(result['queue_depth']) == {'read', 'insert'}
+    for stats in result['queue_depth'].values():
+        assert stats['capacity'] == 2
+        assert 0 <= stats['avg'] <= stats['max'] <= 2
+
+
+def test_sequential_run_reports_no_queues(trip_file, upload):
+    _, result, _ = upload(trip_file)
+    assert 'queue_depth' not in result
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+def test_transform_error_stops_the_pipeline(trip_file, upload, monkeypatch, engine):
+    calls = []
+
+    def broken(self, batch):
+        calls.append(batch)
+        if len(calls) == 3:
+            raise ValueError('injected transform failure')
+        return original(self, batch)
+
+    method = 'transform_table' if engine == 'arrow' else 'transform_batch'
+    original = getattr(YellowTaxiUploader, method)
+    monkeypatch.setattr(YellowTaxiUploader, method, broken)
+
+    threads_before = threading.active_count()
+    _, result, _ = upload(trip_file, engine=engine, pipeline_depth=1, transform_workers=2)
+
+    assert 'injected transform failure' in result['error']
+    # Every stage thread exits instead of blocking on a full queue
+    assert threading.active_count() == threads_before
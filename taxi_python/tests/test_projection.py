@@ -0,0 +1,85 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import generate_tlc_data
+import sinks
+from uploader import YellowTaxiUploader
+
+TABLE = 'yellow_taxi_trips'
+
+
+class NoDescribeSink(sinks.MemorySink):
+    """Memory sink whose server refuses DESCRIBE TABLE."""
+    def query(self, query: str, *args, **kwargs):
+        if query.strip().upper().startswith('DESCRIBE TABLE'):
+            raise RuntimeError('Code: 497. DB::Exception: Not enough privileges')
+        return super().query(query, *args, **kwargs)
+
+
+def loaded(sink) -> pd.DataFrame:
+    df = pa.concat_tables(sink.tables(TABLE)).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def months(tmp_path_factory) -> dict:
+    """The same trips written in each casing variant, plus one with a column the table lacks."""
+    files = {}
+    for casing in generate_tlc_data.CASING_VARIANTS:
+        output_dir = str(tmp_path_factory.mktemp(casing))
+        files[casing] = generate_tlc_data.write_month(output_dir, 'yellow', '2023-04', 3000, row_group_size=1000,
+                                                      casing=casing)
+    table = pq.read_table(files['standard'])
+    output_dir = tmp_path_factory.mktemp('unknown')
+    files['unknown'] = str(output_dir / 'yellow_tripdata_2023-04.parquet')
+    pq.write_table(table.append_column('unknown_column', pa.array(['x'] * len(table))), files['unknown'],
+                   row_group_size=1000)
+    return files
+
+
+def test_columns_missing_from_the_table_are_not_read(months):
+    uploader = YellowTaxiUploader('memory://')
+    parquet_columns = pq.ParquetFile(months['unknown']).schema_arrow.names
+    target_columns = uploader._get_target_columns()
+
+    columns = uploader._projected_columns(parquet_columns)
+
+    assert 'unknown_column' not in columns
+    assert columns == [col for col in parquet_columns if col in target_columns]
+
+
+@pytest.mark.parametrize('casing', ['lower', 'mixed'])
+def test_casing_variants_are_projected_and_loaded(months, upload, casing):
+    uploader = YellowTaxiUploader('memory://')
+    columns = uploader._projected_columns(pq.ParquetFile(months[casing]).schema_arrow.names)
+    assert 'airport_fee' in columns
+    if casing == 'mixed':
+        assert 'Ratecodeid' in columns
+
+    _, _, standard_sink = upload(months['standard'])
+    _, result, sink = upload(months[casing])
+
+    assert 'error' not in result
+    pd.testing.assert_frame_equal(loaded(sink), loaded(standard_sink))
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+def test_unknown_columns_do_not_change_the_load(months, upload, engine):
+    _, _, standard_sink = upload(months['standard'], engine=engine)
+    _, result, sink = upload(months['unknown'], engine=engine)
+
+    assert 'error' not in result
+    pd.testing.assert_frame_equal(loaded(sink), loaded(standard_sink))
+
+
+def test_describe_failure_reads_every_column(months, upload):
+    uploader = YellowTaxiUploader('memory://', client=NoDescribeSink())
+    assert uploader._projected_columns(pq.ParquetFile(months['standard']).schema_arrow.names) is None
+
+    _, _, standard_sink = upload(months['standard'])
+    _, result, sink = upload(months['standard'], NoDescribeSink())
+
+    assert 'error' not in result
+    assert result['rows_uploaded'] == sum(len(block) for block in standard_sink.tables(TABLE))
@@ -0,0 +1,46 @@
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import generate_tlc_data
+
+TABLE = 'yellow_taxi_trips'
+FROM_DATE, TO_DATE = date(2023, 5, 10), date(2023, 5, 16)
+
+
+def loaded(sink) -> pd.DataFrame:
+    df = pa.concat_tables(sink.tables(TABLE)).to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def sorted_month(tmp_path_factory) -> str:
+    """A month sorted by pickup time, so each row group covers a few days."""
+    table = generate_tlc_data.generate_trips('yellow', '2023-05', 8000, stray_fraction=0)
+    path = str(tmp_path_factory.mktemp('sorted') / 'yellow_tripdata_2023-05.parquet')
+    pq.write_table(table.sort_by('tpep_pickup_datetime'), path, row_group_size=500)
+    return path
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+def test_row_groups_outside_the_dates_are_pruned(sorted_month, upload, engine):
+    _, full, full_sink = upload(sorted_month, engine=engine)
+    _, result, sink = upload(sorted_month, engine=engine, from_date=FROM_DATE, to_date=TO_DATE)
+
+    assert full['row_groups_pruned'] == 0
+    assert 0 < result['row_groups_pruned'] < result['row_groups_total']
+    assert result['rows_processed'] < full['rows_processed']
+
+    expected = loaded(full_sink)
+    pickup = expected['tpep_pickup_datetime'].dt.date
+    expected = expected[(pickup >= FROM_DATE) & (pickup <= TO_DATE)].reset_index(drop=True)
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(loaded(sink), expected)
+
+
+def test_unsorted_files_are_not_pruned(trip_file, upload):
+    _, result, _ = upload(trip_file, from_date=date(2023, 3, 10), to_date=date(2023, 3, 16))
+    assert result['row_groups_pruned'] == 0
@@ -0,0 +1,71 @@
+from datetime import date
+
+import pyarrow as pa
+import pytest
+
+import sinks
+from uploader import YellowTaxiUploader
+
+TABLE = 'yellow_taxi_trips'
+STAGING_TABLE = 'yellow_taxi_trips_staging_202303'
+
+
+class ShortCountSink(sinks.MemorySink):
+    """Memory sink whose staging table reports fewer rows than were inserted."""
+    def query(self, query: str, *args, **kwargs):
+        result = super().query(query, *args, **kwargs)
+        if 'count()' in query:
+            result.result_rows[0][0] -= 1
+        return result
+
+
+def test_file_month_is_swapped_in_through_a_staging_table(trip_file, upload):
+    _, result, sink = upload(trip_file, replace=True)
+
+    assert 'error' not in result
+    assert result['replaced_partition'] == '202303'
+    assert sink.commands == [
+        f"DROP TABLE IF EXISTS {STAGING_TABLE}",
+        f"CREATE TABLE {STAGING_TABLE} AS {TABLE}",
+        f"ALTER TABLE {TABLE} REPLACE PARTITION 202303 FROM {STAGING_TABLE}",
+        f"DROP TABLE IF EXISTS {STAGING_TABLE}",
+    ]
+    assert not sink.tables(TABLE)
+    assert sum(len(block) for block in sink.tables(STAGING_TABLE)) == result['rows_uploaded']
+
+
+def test_rows_of_other_months_are_filtered(trip_file, upload):
+    _, full, _ = upload(trip_file)
+    _, result, sink = upload(trip_file, replace=True)
+
+    pickups = pa.concat_tables(sink.tables(STAGING_TABLE)).column('tpep_pickup_datetime').to_pandas()
+    assert ((pickups >= '2023-03-01') & (pickups < '2023-04-01')).all()
+    # The synthetic month has stray pickups that a normal load keeps
+    assert result['rows_uploaded'] < full['rows_uploaded']
+
+
+def test_count_mismatch_keeps_the_partition(trip_file, upload):
+    _, result, sink = upload(trip_file, ShortCountSink(), replace=True)
+
+    assert result['error'].startswith(f"Staging table {STAGING_TABLE} has")
+    assert not [command for command in sink.commands if 'REPLACE PARTITION' in command]
+    assert sink.commands[-1] == f"DROP TABLE IF EXISTS {STAGING_TABLE}"
+
+
+def test_loaded_file_is_skipped_before_staging(trip_file, upload, tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    upload(trip_file, replace=True, manifest_path=manifest_path)
+    _, result, sink = upload(trip_file, replace=True, manifest_path=manifest_path)
+
+    assert result['skipped']
+    assert sink.commands == []
+
+
+def test_replace_cannot_be_combined_with_dates():
+    with pytest.raises(ValueError, match='from_date/to_date'):
+        YellowTaxiUploader('memory://', replace=True, from_date=date(2023, 3, 1))
+
+
+def test_exports_ignore_replace(tmp_path):
+    uploader = YellowTaxiUploader('memory://', client=sinks.PartitionExportSink(str(tmp_path)), replace=True)
+    assert uploader.replace is False
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import run_report
+
+CONFIG = {'sink': 'memory', 'engine': 'arrow', 'workers': 1, 'batch_size': 700}
+
+
+def history_entry(rows_per_second: float, **config) -> dict:
+    return {'run_id': f'run-{rows_per_second}', 'table': 'yellow_taxi_trips', **CONFIG, **config,
+            'rows_per_second': rows_per_second}
+
+
+def write_history(path, entries: list) -> str:
+    path.write_text(''.join(json.dumps(entry) + '\n' for entry in entries), encoding='utf-8')
+    return str(path)
+
+
+def test_report_totals_and_history_line(trip_file, upload, tmp_path):
+    _, result, _ = upload(trip_file)
+    failed = {'file': 'broken.parquet', 'error': 'boom', 'rows_uploaded': 0}
+    report = run_report.build_report([{'table': 'yellow_taxi_trips', 'results': [result, failed],
+                                       'total_size_mb': 2.0, 'total_elapsed': 4.0}], CONFIG)
+
+    totals = report['tables'][0]['totals']
+    assert totals['files'] == 2 and totals['failed_files'] == 1
+    assert totals['rows_uploaded'] == result['rows_uploaded']
+    assert totals['rows_per_second'] == result['rows_uploaded'] / 4.0
+    assert set(totals['stage_wall_seconds']) == set(result['stages'])
+
+    history_path = str(tmp_path / 'history.jsonl')
+    run_report.append_history(report, history_path)
+    run_report.append_history(report, history_path)
+    history = run_report.load_history(history_path)
+    assert len(history) == 2
+    assert all(key in history[0] for key in run_report.COMPARABLE_KEYS)
+    assert history[0]['pipeline_depth'] == run_report.COMPARABLE_DEFAULTS['pipeline_depth']
+
+
+@pytest.mark.parametrize('latest, expected', [(100.0, 0), (95.0, 0), (80.0, 1)])
+def test_main_exits_non_zero_on_regression(tmp_path, latest, expected):
+    path = write_history(tmp_path / 'history.jsonl',
+                         [history_entry(rows) for rows in (90.0, 100.0, 110.0)] + [history_entry(latest)])
+    assert run_report.main([path]) == expected
+
+
+def test_threshold_and_window(tmp_path):
+    entries = [history_entry(rows) for rows in (10.0, 100.0, 100.0, 85.0)]
+    path = write_history(tmp_path / 'history.jsonl', entries)
+
+    assert run_report.main([path]) == 1
+    assert run_report.main([path, '--threshold', '0.2']) == 0
+    # The window keeps the most recent runs, leaving out the slow first one
+    [comparison] = run_report.compare_latest(entries, window=1)
+    assert comparison['baseline_runs'] == 1 and comparison['baseline_rows_per_second'] == 100.0
+
+
+def test_only_comparable_runs_are_compared(tmp_path):
+    entries = [
+        history_entry(100.0),
+        history_entry(50.0, insert_workers=4),
+        history_entry(10.0, sink='null'),
+        history_entry(99.0),
+    ]
+    [comparison] = run_report.compare_latest(entries)
+    assert comparison['rows_per_second'] == 99.0
+    assert comparison['baseline_rows_per_second'] == 100.0
+
+    path = write_history(tmp_path / 'history.jsonl', entries[1:3])
+    assert run_report.main([path]) == 0
+
+
+def test_entries_without_new_settings_use_defaults():
+    old = history_entry(100.0)
+    new = history_entry(50.0, pipeline_depth=0, transform_workers=1, insert_workers=1, sort_blocks=False)
+    [comparison] = run_report.compare_latest([old, new])
+    assert comparison['regression']
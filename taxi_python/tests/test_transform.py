@@ -0,0 +1,113 @@
+"""
+Both engines against values pinned from the original pandas transform of YellowTaxiUploader
+and GreenTaxiUploader, on hand-made trips that hit every cleaning rule and filter.
+"""
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import sinks
+from uploader import GreenTaxiUploader, YellowTaxiUploader
+
+# Trip id (PULocationID), pickup, minutes, passengers, distance, RatecodeID, store_and_fwd_flag,
+# payment_type, fare, tip, total, congestion surcharge, airport fee (yellow only)
+TRIPS = [
+    (1, datetime(2023, 3, 1, 8, 15), 20, 2, 3.5, 1, 'N', 1, 15.0, 3.0, 22.3, 2.5, 0.0),
+    # Missing values are filled; green files leave payment_type empty as well
+    (2, datetime(2023, 3, 4, 23, 50), 20, None, 1.2, None, None, 2, 8.0, 0.0, 10.0, None, None),
+    # Tip and speed are clipped to 100
+    (3, datetime(2023, 3, 5, 12, 0), 60, 1, 300.0, 2, 'Y', 1, 10.0, 50.0, 60.0, 0.0, 1.75),
+    # No fare, no tip percentage
+    (4, datetime(2023, 3, 10, 6, 30), 7.5, 4, 2.25, 1, 'N', 3, 0.0, 0.0, 1.0, 2.5, 0.0),
+    # Longest trip kept, pickup in the previous month
+    (5, datetime(2023, 2, 28, 23, 59), 1440, 1, 499.5, 5, 'N', 4, 70.0, 7.77, 80.0, 0.0, 0.0),
+    # Filtered: distance, duration, negative amounts, pickup before 2020 or in the future
+    (6, datetime(2023, 3, 11, 1, 0), 10, 1, 0.0, 1, 'N', 1, 5.0, 0.0, 6.0, 0.0, 0.0),
+    (7, datetime(2023, 3, 11, 2, 0), 10, 1, 500.0, 1, 'N', 1, 5.0, 0.0, 6.0, 0.0, 0.0),
+    (8, datetime(2023, 3, 11, 3, 0), 0, 1, 1.0, 1, 'N', 1, 5.0, 0.0, 6.0, 0.0, 0.0),
+    (9, datetime(2023, 3, 11, 4, 0), 1441, 1, 1.0, 1, 'N', 1, 5.0, 0.0, 6.0, 0.0, 0.0),
+    (10, datetime(2023, 3, 11, 5, 0), 10, 1, 1.0, 1, 'N', 1, -5.0, 0.0, 6.0, 0.0, 0.0),
+    (11, datetime(2023, 3, 11, 6, 0), 10, 1, 1.0, 1, 'N', 1, 5.0, 0.0, -6.0, 0.0, 0.0),
+    (12, datetime(2019, 12, 31, 23, 0), 10, 1, 1.0, 1, 'N', 1, 5.0, 0.0, 6.0, 0.0, 0.0),
+    (13, datetime(2099, 1, 1, 0, 0), 10, 1, 1.0, 1, 'N', 1, 5.0, 0.0, 6.0, 0.0, 0.0),
+]
+
+# Output of the original transform for the kept trips, computed once and pinned here
+PINNED_COLUMNS = ('passenger_count', 'RatecodeID', 'store_and_fwd_flag', 'payment_type', 'congestion_surcharge',
+                  'trip_duration_minutes', 'pickup_hour', 'pickup_day_of_week', 'pickup_date', 'tip_percentage',
+                  'avg_speed_mph')
+EXPECTED = {
+    'yellow': {
+        1: (2, 1, False, 1, 2.5, 20.0, 8, 2, '2023-03-01', 20.0, 10.5),
+        2: (1, 1, False, 2, 0.0, 20.0, 23, 5, '2023-03-04', 0.0, 3.6),
+        3: (1, 2, True, 1, 0.0, 60.0, 12, 6, '2023-03-05', 100.0, 100.0),
+        4: (4, 1, False, 3, 2.5, 7.5, 6, 4, '2023-03-10', 0.0, 18.0),
+        5: (1, 5, False, 4, 0.0, 1440.0, 23, 1, '2023-02-28', 11.1, 20.8125),
+    },
+    'green': {
+        1: (2, 1, False, 1, 2.5, 20.0, 8, 2, '2023-03-01', 20.0, 10.5),
+        2: (1, 1, False, 0, 0.0, 20.0, 23, 5, '2023-03-04', 0.0, 3.6),
+        3: (1, 2, True, 1, 0.0, 60.0, 12, 6, '2023-03-05', 100.0, 100.0),
+        4: (4, 1, False, 3, 2.5, 7.5, 6, 4, '2023-03-10', 0.0, 18.0),
+        5: (1, 5, False, 4, 0.0, 1440.0, 23, 1, '2023-02-28', 11.1, 20.8125),
+    },
+}
+EXPECTED_AIRPORT_FEES = {1: 0.0, 2: 0.0, 3: 1.75, 4: 0.0, 5: 0.0}
+
+
+def raw_trips(taxi_type: str) -> pa.Table:
+    """The trips as a TLC file of `taxi_type` lays them out."""
+    prefix = 'tpep' if taxi_type == 'yellow' else 'lpep'
+    count_type = pa.int64() if taxi_type == 'yellow' else pa.float64()
+    column = lambda index: [trip[index] for trip in TRIPS]
+    payments = [None if taxi_type == 'green' and trip[3] is None else trip[7] for trip in TRIPS]
+    columns = {
+        'VendorID': pa.array([2] * len(TRIPS), pa.int32()),
+        f'{prefix}_pickup_datetime': pa.array(column(1), pa.timestamp('us')),
+        f'{prefix}_dropoff_datetime': pa.array([pd.Timestamp(trip[1]) + pd.Timedelta(minutes=trip[2]) for trip in TRIPS], pa.timestamp('us')),
+        'passenger_count': pa.array(column(3), count_type),
+        'trip_distance': pa.array(column(4), pa.float64()),
+        'RatecodeID': pa.array(column(5), count_type),
+        'store_and_fwd_flag': pa.array(column(6), pa.string()),
+        'PULocationID': pa.array(column(0), pa.int32()),
+        'DOLocationID': pa.array([132] * len(TRIPS), pa.int32()),
+        'payment_type': pa.array(payments, count_type),
+        'fare_amount': pa.array(column(8), pa.float64()),
+        'extra': pa.array([0.5] * len(TRIPS), pa.float64()),
+        'mta_tax': pa.array([0.5] * len(TRIPS), pa.float64()),
+        'tip_amount': pa.array(column(9), pa.float64()),
+        'tolls_amount': pa.array([0.0] * len(TRIPS), pa.float64()),
+        'improvement_surcharge': pa.array([1.0] * len(TRIPS), pa.float64()),
+        'total_amount': pa.array(column(10), pa.float64()),
+        'congestion_surcharge': pa.array(column(11), pa.float64()),
+    }
+    if taxi_type == 'yellow':
+        columns['Airport_fee'] = pa.array(column(12), pa.float64())
+    else:
+        columns['ehail_fee'] = pa.array([None] * len(TRIPS), pa.float64())
+        columns['trip_type'] = pa.array([1.0] * len(TRIPS), pa.float64())
+    return pa.table(columns)
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'arrow'])
+@pytest.mark.parametrize('taxi_type, uploader_cls', [('yellow', YellowTaxiUploader), ('green', GreenTaxiUploader)])
+def test_engines_match_the_original_transform(tmp_path, taxi_type, uploader_cls, engine):
+    file_path = str(tmp_path / f"{taxi_type}_tripdata_2023-03.parquet")
+    pq.write_table(raw_trips(taxi_type), file_path)
+    sink = sinks.MemorySink()
+    uploader = uploader_cls('memory://', client=sink, engine=engine)
+
+    result = uploader.upload_file(file_path)
+
+    assert 'error' not in result
+    loaded = pa.concat_tables(sink.tables(uploader.table_name)).to_pandas()
+    loaded['pickup_date'] = pd.to_datetime(loaded['pickup_date']).dt.strftime('%Y-%m-%d')
+    trips = {int(row.pop('PULocationID')): row for row in loaded.to_dict('records')}
+    assert set(trips) == set(EXPECTED[taxi_type])
+    for trip_id, expected in EXPECTED[taxi_type].items():
+        assert tuple(trips[trip_id][name] for name in PINNED_COLUMNS) == pytest.approx(expected, rel=1e-6)
+        if taxi_type == 'yellow':
+            assert trips[trip_id]['Airport_fee'] == EXPECTED_AIRPORT_FEES[trip_id]
@@ -0,0 +1,169 @@
+"""
+Minimal Prometheus/OpenMetrics instrumentation for the taxi data uploader.
+
+Metrics live in a process-wide registry and are exposed either over HTTP for scraping or
+written to a file picked up by node_exporter's textfile collector. Only the standard
+library is used, so a scrape can be tested locally without any external service.
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Insert latency buckets in seconds, from small incremental blocks to 1M+ row blocks
+DEFAULT_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters, gauges and histograms."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: tuple = DEFAULT_LATENCY_BUCKETS) -> None:
+        """Register a metric; `metric_type` is 'counter', 'gauge' or 'histogram'."""
+        with self._lock:
+            self._metrics.setdefault(name, {
+                'type': metric_type,
+                'help': help_text,
+                'buckets': tuple(buckets) if metric_type == 'histogram' else None,
+                'samples': {}
+            })
+
+    @staticmethod
+    def _label_key(labels: dict) -> tuple:
+        return tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, labels: dict = None, value: float = 1) -> None:
+        with self._lock:
+            samples = self._metrics[name]['samples']
+            key = self._label_key(labels)
+            samples[key] = samples.get(key, 0) + value
+
+    def set(self, name: str, labels: dict = None, value: float = 0) -> None:
+        with self._lock:
+            self._metrics[name]['samples'][self._label_key(labels)] = value
+
+    def observe(self, name: str, labels: dict = None, value: float = 0) -> None:
+        with self._lock:
+            metric = self._metrics[name]
+            sample = metric['samples'].setdefault(self._label_key(labels), {
+                'buckets': [0] * len(metric['buckets']), 'sum': 0.0, 'count': 0
+            })
+            for i, bound in enumerate(metric['buckets']):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+
+    def snapshot(self, reset: bool = False) -> dict:
+        """
+        Return a picklable copy of all samples, e.g. to ship from a worker process.
+
+        With `reset`, counters and histograms start again from zero so that repeated
+        snapshots can be merged without double counting.
+        """
+        with self._lock:
+            snapshot = {}
+            for name, metric in self._metrics.items():
+                samples = {
+                    key: dict(value, buckets=list(value['buckets'])) if isinstance(value, dict) else value
+                    for key, value in metric['samples'].items()
+                }
+                snapshot[name] = {**metric, 'samples': samples}
+                if reset and metric['type'] != 'gauge':
+                    metric['samples'] = {}
+            return snapshot
+
+    def merge(self, snapshot: dict) -> None:
+        """Add the samples of another registry's snapshot; gauges take the snapshot's value."""
+        for name, metric in snapshot.items():
+            self.describe(name, metric['type'], metric['help'], metric['buckets'] or ())
+            with self._lock:
+                samples = self._metrics[name]['samples']
+                for key, value in metric['samples'].items():
+                    if metric['type'] == 'gauge':
+                        samples[key] = value
+                    elif metric['type'] == 'counter':
+                        samples[key] = samples.get(key, 0) + value
+                    else:
+                        current = samples.setdefault(key, {'buckets': [0] * len(value['buckets']), 'sum': 0.0, 'count': 0})
+                        current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                        current['sum'] += value['sum']
+                        current['count'] += value['count']
+
+    @staticmethod
+    def _format_labels(key: tuple, extra: tuple = ()) -> str:
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + '}'
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, metric in sorted(self._metrics.items()):
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, value in sorted(metric['samples'].items()):
+                    if metric['type'] != 'histogram':
+                        lines.append(f"{name}{self._format_labels(key)} {value}")
+                        continue
+                    for bound, count in zip(metric['buckets'], value['buckets']):
+                        lines.append(f"{name}_bucket{self._format_labels(key, (('le', bound),))} {count}")
+                    lines.append(f"{name}_bucket{self._format_labels(key, (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {value['sum']}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str) -> None:
+        """Atomically write the metrics for node_exporter's textfile collector."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry used by the uploaders
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe('taxi_uploader_rows_read_total', 'counter', 'Rows read from parquet files.')
+REGISTRY.describe('taxi_uploader_rows_filtered_total', 'counter', 'Rows dropped by the data quality filters.')
+REGISTRY.describe('taxi_uploader_rows_inserted_total', 'counter', 'Rows inserted into ClickHouse.')
+REGISTRY.describe('taxi_uploader_bytes_read_total', 'counter', 'Decoded bytes read from parquet files.')
+REGISTRY.describe('taxi_uploader_bytes_inserted_total', 'counter', 'In-memory bytes of the blocks sent to ClickHouse.')
+REGISTRY.describe('taxi_uploader_wire_bytes_total', 'counter', 'Bytes sent over HTTP by insert calls, after compression.')
+REGISTRY.describe('taxi_uploader_insert_retries_total', 'counter', 'Inserts retried after a transient error.')
+REGISTRY.describe('taxi_uploader_block_splits_total', 'counter', 'Insert blocks split in halves after being rejected as too large.')
+REGISTRY.describe('taxi_uploader_insert_latency_seconds', 'histogram', 'Latency of a single insert call.')
+REGISTRY.describe('taxi_uploader_queue_depth', 'gauge', 'Batches waiting in an upload pipeline queue.')
+REGISTRY.describe('taxi_uploader_errors_total', 'counter', 'Files that failed to upload.')
+
+
+def start_http_server(port: int, addr: str = '', registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve the registry on http://addr:port/metrics from a daemon thread."""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep scrapes out of the upload progress output
+            pass
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server